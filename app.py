@@ -6,21 +6,34 @@ import webbrowser
 import vlc
 import threading
 from datetime import datetime, timedelta
+from collections import OrderedDict
 import shutil
+import hashlib
+import sqlite3
+import queue
+import concurrent.futures
+from contextlib import contextmanager
 import time
 import random  # Added for shuffle functionality
+import difflib
+import re
+import bisect
+import array
+from urllib.parse import urlparse, parse_qs
 
 # Import PyQt6 modules for GUI creation
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                            QLabel, QPushButton, QListWidget, QLineEdit, QSlider, QTableWidget, 
-                            QTableWidgetItem, QHeaderView, QSplitter, QDialog, QDialogButtonBox, 
+                            QLabel, QPushButton, QListWidget, QLineEdit, QSlider, QTableView, 
+                            QStyledItemDelegate, QStyle, QHeaderView, QSplitter, QDialog, QDialogButtonBox, 
                             QFormLayout, QMessageBox, QMenuBar, QAbstractItemView, QProgressDialog, 
-                            QProgressBar, QMenu)
-from PyQt6.QtGui import QIcon, QPixmap, QFont, QAction
-from PyQt6.QtCore import Qt, QSize, QTimer, pyqtSignal, QUrl, QMetaObject, Q_ARG, pyqtSlot, QThread
+                            QProgressBar, QMenu, QListWidgetItem)
+from PyQt6.QtGui import QIcon, QPixmap, QImage, QFont, QAction, QColor, QPainter
+from PyQt6.QtCore import (Qt, QSize, QTimer, pyqtSignal, QUrl, QMetaObject, Q_ARG, pyqtSlot, QThread,
+                          QAbstractTableModel, QModelIndex, QEvent, QObject)
 
 # Import external libraries for web requests and YouTube downloading
 import requests
+from requests.adapters import HTTPAdapter
 import yt_dlp
 
 # Try to import Spotify-related libraries, exit if not installed
@@ -31,66 +44,1459 @@ except ImportError:
     print("Spotipy not installed. Please install it using: pip install spotipy")
     sys.exit(1)
 
-# In-memory cache for stream URLs and Spotify data
-STREAM_CACHE = {}
-SPOTIFY_CACHE = {}
-CACHE_FILE = "stream_cache.json"
-SPOTIFY_CACHE_FILE = "spotify_cache.json"
+# Sharded on-disk cache for Spotify data, SQLite-backed cache for stream URLs
+STREAM_CACHE = None
+CACHE_FILE = "stream_cache.json"  # Legacy stream cache, migrated into STREAM_CACHE_DB once
+STREAM_CACHE_DB = "stream_cache.db"
+SPOTIFY_CACHE_FILE = "spotify_cache.json"  # Legacy single-file Spotify cache, migrated into SPOTIFY_CACHE_DIR once
+SPOTIFY_CACHE_DIR = "spotify_cache"
+SPOTIFY_CACHE_MEMORY_BYTES = 32 * 1024 * 1024  # Encoded size of Spotify cache shards kept in memory
 CACHE_EXPIRY_DAYS = 7  # Cache entries expire after 7 days
+STREAM_URL_FALLBACK_TTL = 6 * 3600  # Lifetime assumed for stream URLs without an expire= parameter
+STREAM_URL_REFRESH_MARGIN = 15 * 60  # Re-resolve URLs that expire within this many seconds
+FAILED_LOOKUP_BASE_TTL = 10 * 60  # Skip a track whose lookup failed for this long, doubling per repeat failure
+FAILED_LOOKUP_MAX_TTL = 24 * 3600  # Upper bound for the failed lookup backoff
+YDL_OPTS = {
+    'format': 'bestaudio/best',
+    'quiet': True,
+    'noplaylist': True,
+    'no_progress': True,
+}
+YDL_POOL_SIZE = 4  # Number of YoutubeDL instances shared by playback, prefetch, warming and downloads
+YDL_SLOW_ACQUIRE = 0.5  # Log acquisitions that wait longer than this many seconds
+PREFETCH_AHEAD = 3  # Number of upcoming queue entries resolved while the current track plays
+# Parallel lookups when warming a whole playlist; one instance is left for the
+# prefetcher and one for playback and downloads, so warming never starves them
+WARM_WORKERS = max(1, YDL_POOL_SIZE - 2)
+WARM_REQUESTS_PER_SECOND = 1.5  # Cap on YouTube lookups started by playlist warming
+SPOTIFY_CACHE_FLUSH_DELAY = 3.0  # Seconds to batch Spotify cache changes before writing them
+SPOTIFY_CACHE_SOFT_TTL = 10 * 60  # Cached library views older than this are refreshed in the background
+# Only the fields TrackRecord keeps; endpoints without a fields parameter get
+# market="from_token" instead, which drops the available_markets arrays
+SPOTIFY_PLAYLIST_TRACK_FIELDS = "items(added_at,track(id,name,duration_ms,artists(name),album(name,images))),total"
+SPOTIFY_MARKET = "from_token"
+SPOTIFY_PAGE_WORKERS = 4  # Pages of a Spotify listing fetched concurrently after the first one
+SPOTIFY_MAX_RETRIES = 4  # Retries per Spotify call after 429 Too Many Requests or a server error
+SPOTIFY_MAX_RETRY_DELAY = 30  # Longest wait in seconds before a retry, whatever Retry-After asks for
+LIBRARY_LOADER_EXIT_WAIT_MS = 3000  # How long closing the window waits for cancelled library loads in total
+SPOTIFY_API_HOST = "api.spotify.com"
+SPOTIFY_ACCOUNTS_HOST = "accounts.spotify.com"
+HTTP_TIMEOUT = (3.05, 10)  # Connect and read timeouts in seconds for every HTTP request
+HTTP_POOL_SIZE = 8  # Keep-alive connections kept per host
+HTTP_HOST_CONCURRENCY = 6  # Requests allowed in flight per host
+HTTP_MAX_RETRIES = 2  # Retries per request after a connection error or retryable status
+HTTP_RETRY_BACKOFF = 0.5  # Base delay in seconds, doubled per attempt with full jitter
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_RETRY_BUDGET_RATIO = 0.1  # Retries per host may not exceed this share of its requests...
+HTTP_RETRY_BUDGET_MIN = 10  # ...plus this many, so an outage cannot multiply the load
+SEARCH_PAGE_SIZE = 50  # Tracks per search results page, fetched one page at a time
+SEARCH_DEBOUNCE_MS = 350  # Typing pause before search-as-you-type starts a search
+SEARCH_AS_YOU_TYPE_MIN_CHARS = 2  # Shorter queries wait for Enter
+LOCAL_SEARCH_LIMIT = 200  # Most matches shown from the local search index
+LOCAL_SEARCH_DOWNLOADS = "downloaded"  # Local search index source for the download folder
+SEARCH_CACHE_FILE = "search_cache.json"
+SEARCH_CACHE_TTL = 30 * 60  # Seconds a cached search results page stays valid
+SEARCH_CACHE_MAX_ENTRIES = 200  # Search result pages kept, least recently used evicted first
+ALBUM_ART_SIZE = 80  # Edge in pixels of the album art shown next to the playback controls
+ALBUM_ART_CACHE_DIR = "album_art_cache"  # Album art downscaled to ALBUM_ART_SIZE, one JPEG per image URL
+ALBUM_ART_DISK_BYTES = 20 * 1024 * 1024  # Album art cache size on disk, least recently used trimmed first
+ALBUM_ART_MEMORY_BYTES = 8 * 1024 * 1024  # Decoded album art kept in memory
+ALBUM_ART_WORKERS = 2  # Album art fetched and decoded in parallel
 DOWNLOAD_FOLDER = "Downloaded"
 
-# Load stream cache from file if it exists
-def load_stream_cache():
-    global STREAM_CACHE
-    if os.path.exists(CACHE_FILE):
+# Build the stream cache key for a track
+def stream_cache_key(title, artist):
+    """Normalize case and whitespace so every caller maps a track to the same key."""
+    return f"{' '.join(title.split()).casefold()} - {' '.join(artist.split()).casefold()}"
+
+# Read the expiry timestamp embedded in a signed stream URL
+def stream_url_expiry(url):
+    """Return the expire= timestamp of a googlevideo URL, or None if absent."""
+    try:
+        parsed = urlparse(url)
+        expire = parse_qs(parsed.query).get('expire')
+        if expire:
+            return float(expire[0])
+        parts = parsed.path.split('/')
+        if 'expire' in parts:  # Manifest-style URLs carry /expire/<ts>/ in the path
+            return float(parts[parts.index('expire') + 1])
+    except (ValueError, IndexError):
+        pass
+    return None
+
+# Define a thread-safe stream URL cache stored in SQLite
+class StreamCache:
+    """Stream URL cache with single-row upserts and lazy lookups.
+
+    Two tiers are kept: `videos` maps a track key to the YouTube video ID
+    found by search and never expires, while `streams` holds the signed URL
+    for that track until its expire= timestamp. `failures` remembers tracks
+    that could not be resolved, with a backoff before the next attempt. The
+    database runs in WAL mode so the loader thread and download threads
+    never rewrite the whole cache; every access goes through one connection
+    guarded by a lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS streams (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_streams_expires_at ON streams (expires_at)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    key TEXT PRIMARY KEY,
+                    video_id TEXT NOT NULL,
+                    timestamp REAL NOT NULL
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS failures (
+                    key TEXT PRIMARY KEY,
+                    reason TEXT NOT NULL,
+                    failures INTEGER NOT NULL,
+                    retry_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_failures_retry_at ON failures (retry_at)")
+            self.conn.commit()
+
+    def get(self, key, margin=0):
+        """Return the cached URL for key, or None if missing or expiring within margin seconds."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT url FROM streams WHERE key = ? AND expires_at > ?",
+                (key, time.time() + margin)
+            ).fetchone()
+        return row[0] if row else None
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def put(self, key, url, timestamp=None):
+        timestamp = timestamp if timestamp is not None else time.time()
+        expires_at = self.url_expires_at(url, timestamp)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO streams (key, url, timestamp, expires_at) VALUES (?, ?, ?, ?)",
+                (key, url, timestamp, expires_at)
+            )
+            self.conn.commit()
+
+    @staticmethod
+    def url_expires_at(url, timestamp):
+        expires_at = stream_url_expiry(url)
+        return expires_at if expires_at else timestamp + STREAM_URL_FALLBACK_TTL
+
+    def delete(self, key):
+        with self.lock:
+            self.conn.execute("DELETE FROM streams WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def get_video_id(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT video_id FROM videos WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put_video_id(self, key, video_id):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO videos (key, video_id, timestamp) VALUES (?, ?, ?)",
+                (key, video_id, time.time())
+            )
+            self.conn.commit()
+
+    def delete_video_id(self, key):
+        with self.lock:
+            self.conn.execute("DELETE FROM videos WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def get_failure(self, key):
+        """Return (reason, retry_at) while a failed lookup is still backing off, else None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT reason, retry_at FROM failures WHERE key = ? AND retry_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return row
+
+    def record_failure(self, key, reason):
+        """Store a failed lookup; each repeat failure doubles the time before the next attempt."""
+        with self.lock:
+            row = self.conn.execute("SELECT failures FROM failures WHERE key = ?", (key,)).fetchone()
+            failures = row[0] + 1 if row else 1
+            ttl = min(FAILED_LOOKUP_MAX_TTL, FAILED_LOOKUP_BASE_TTL * 2 ** (failures - 1))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO failures (key, reason, failures, retry_at) VALUES (?, ?, ?, ?)",
+                (key, reason, failures, time.time() + ttl)
+            )
+            self.conn.commit()
+        return ttl
+
+    def clear_failure(self, key):
+        with self.lock:
+            self.conn.execute("DELETE FROM failures WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def purge_expired(self):
+        now = time.time()
+        with self.lock:
+            self.conn.execute("DELETE FROM streams WHERE expires_at <= ?", (now,))
+            # Forget the backoff of tracks that have not failed again for a while
+            self.conn.execute("DELETE FROM failures WHERE retry_at <= ?", (now - FAILED_LOOKUP_MAX_TTL,))
+            self.conn.commit()
+
+    def migrate_json(self, json_path):
+        """Import a legacy stream_cache.json file once, then move it aside."""
+        if not os.path.exists(json_path):
+            return
         try:
-            with open(CACHE_FILE, 'r') as f:
+            with open(json_path, 'r') as f:
                 cached_data = json.load(f)
-                now = datetime.now()
-                STREAM_CACHE = {
-                    key: value for key, value in cached_data.items()
-                    if datetime.fromisoformat(value['timestamp']) + timedelta(days=CACHE_EXPIRY_DAYS) > now
-                }
+            rows = []
+            for key, value in cached_data.items():
+                timestamp = datetime.fromisoformat(value['timestamp']).timestamp()
+                rows.append((key, value['url'], timestamp, self.url_expires_at(value['url'], timestamp)))
+            with self.lock:
+                with self.conn:
+                    self.conn.executemany(
+                        "INSERT OR IGNORE INTO streams (key, url, timestamp, expires_at) VALUES (?, ?, ?, ?)",
+                        rows
+                    )
+            os.replace(json_path, json_path + ".migrated")
+            print(f"Migrated {len(rows)} stream cache entries to {self.path}")
         except Exception as e:
-            print(f"Error loading stream cache: {str(e)}")
-            STREAM_CACHE = {}
+            print(f"Error migrating stream cache: {str(e)}")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
 
-# Save stream cache to file
-def save_stream_cache():
+# Open the stream cache database, migrating the legacy JSON file if present
+def load_stream_cache():
+    global STREAM_CACHE
     try:
-        with open(CACHE_FILE, 'w') as f:
-            json.dump(STREAM_CACHE, f)
-    except Exception as e:
-        print(f"Error saving stream cache: {str(e)}")
+        STREAM_CACHE = StreamCache(STREAM_CACHE_DB)
+        STREAM_CACHE.migrate_json(CACHE_FILE)
+        STREAM_CACHE.purge_expired()
+    except sqlite3.Error as e:
+        print(f"Error opening stream cache: {str(e)}")
+        STREAM_CACHE = StreamCache(":memory:")
+
+# Define a pool of reusable YoutubeDL instances
+class YoutubeDLPool:
+    """Thread-safe pool of pre-warmed YoutubeDL instances.
+
+    Building a YoutubeDL registers every extractor and sets up the cookie jar
+    and HTTP session, so instances are created once and handed out to the
+    loader thread, download workers and bulk resolve jobs in turn. Idle
+    instances are reused most-recently-returned first to keep their
+    connections warm. Acquisition wait and lookup latency are recorded so
+    YDL_POOL_SIZE can be tuned from stats().
+    """
+
+    def __init__(self, size, opts):
+        self.size = size
+        self.opts = opts
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.created = 0
+        self.acquisitions = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.lookups = 0
+        self.lookup_total = 0.0
+        self.lookup_max = 0.0
+
+    def warm(self):
+        """Build the pool's instances in the background."""
+        def build():
+            while self._reserve():
+                self._create_into_pool()
+        threading.Thread(target=build, daemon=True).start()
+
+    def _reserve(self):
+        with self.lock:
+            if self.created >= self.size:
+                return False
+            self.created += 1
+            return True
+
+    def _create(self):
+        try:
+            return yt_dlp.YoutubeDL(self.opts)
+        except Exception:
+            with self.lock:
+                self.created -= 1
+            raise
 
-# Load Spotify cache from file if it exists
-def load_spotify_cache():
-    global SPOTIFY_CACHE
-    if os.path.exists(SPOTIFY_CACHE_FILE):
+    def _create_into_pool(self):
         try:
-            with open(SPOTIFY_CACHE_FILE, 'r') as f:
+            self.idle.put(self._create())
+        except Exception as e:
+            print(f"Error creating YoutubeDL instance: {str(e)}")
+
+    @contextmanager
+    def acquire(self):
+        start = time.perf_counter()
+        try:
+            ydl = self.idle.get_nowait()
+        except queue.Empty:
+            ydl = self._create() if self._reserve() else self.idle.get()
+        waited = time.perf_counter() - start
+        with self.lock:
+            self.acquisitions += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        if waited > YDL_SLOW_ACQUIRE:
+            print(f"Waited {waited:.2f}s for a YoutubeDL instance, consider raising YDL_POOL_SIZE")
+        try:
+            yield ydl
+        finally:
+            self.idle.put(ydl)
+
+    def extract_info(self, target):
+        with self.acquire() as ydl:
+            start = time.perf_counter()
+            try:
+                return ydl.extract_info(target, download=False)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self.lock:
+                    self.lookups += 1
+                    self.lookup_total += elapsed
+                    self.lookup_max = max(self.lookup_max, elapsed)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': self.size,
+                'created': self.created,
+                'acquisitions': self.acquisitions,
+                'wait_avg': self.wait_total / self.acquisitions if self.acquisitions else 0.0,
+                'wait_max': self.wait_max,
+                'lookups': self.lookups,
+                'lookup_avg': self.lookup_total / self.lookups if self.lookups else 0.0,
+                'lookup_max': self.lookup_max,
+            }
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+            except Exception as e:
+                print(f"Error closing YoutubeDL instance: {str(e)}")
+
+YDL_POOL = YoutubeDLPool(YDL_POOL_SIZE, YDL_OPTS)
+
+# Messages yt_dlp uses for videos that will not become playable by retrying
+YOUTUBE_UNAVAILABLE_MARKERS = (
+    "video unavailable",
+    "private video",
+    "has been removed",
+    "account associated with this video has been terminated",
+    "not available in your country",
+)
+
+# Define the error raised for tracks YouTube has no playable result for
+class UnresolvableTrack(Exception):
+    pass
+
+# Tell a video that is gone apart from a timeout, network error or throttling
+def is_unavailable_error(e):
+    message = str(e).lower()
+    return any(marker in message for marker in YOUTUBE_UNAVAILABLE_MARKERS)
+
+# Define an in-flight lookup that concurrent callers can join
+class PendingLookup:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self.waiters = 0
+
+# Define the resolver every caller uses to turn a track into a stream URL
+class StreamResolver:
+    """Resolves tracks through the two-tier stream cache with single-flight lookups.
+
+    Concurrent requests for the same normalized key (playback, prefetch,
+    downloads and playlist warming) join the lookup already in flight and
+    share its URL or error instead of running the same ytsearch again.
+    Failed lookups are remembered in the stream cache's failures table, and
+    tracks still backing off are rejected without touching the network.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.known_failures = 0
+
+    def known_failure(self, title, artist):
+        """Return the reason a track recently failed to resolve, or None."""
+        failure = STREAM_CACHE.get_failure(stream_cache_key(title, artist))
+        return failure[0] if failure else None
+
+    def resolve(self, title, artist, is_cancelled=lambda: False):
+        """Return a stream URL for the track, or None if it failed or the caller cancelled."""
+        cache_key = stream_cache_key(title, artist)
+        while True:
+            # URLs close to their expire= timestamp are treated as misses; a URL
+            # rejected by the server anyway is recovered in on_stream_error
+            cached_url = STREAM_CACHE.get(cache_key, margin=STREAM_URL_REFRESH_MARGIN)
+            if cached_url:
+                with self.lock:
+                    self.hits += 1
+                print(f"Using cached stream URL for {title} - {artist}")
+                return cached_url
+
+            failure = STREAM_CACHE.get_failure(cache_key)
+            if failure:
+                with self.lock:
+                    self.known_failures += 1
+                reason, retry_at = failure
+                print(f"Skipping {title} - {artist}: {reason} (retrying in {int(retry_at - time.time()) // 60} min)")
+                return None
+
+            with self.lock:
+                lookup = self.in_flight.get(cache_key)
+                is_leader = lookup is None
+                if is_leader:
+                    lookup = PendingLookup()
+                    self.in_flight[cache_key] = lookup
+                    self.misses += 1
+                else:
+                    lookup.waiters += 1
+                    self.coalesced += 1
+
+            if is_leader:
+                return self._lead(lookup, cache_key, title, artist, is_cancelled)
+
+            while not lookup.done.wait(0.1):
+                if is_cancelled():
+                    return None
+            if not lookup.cancelled:
+                return lookup.result
+            # The leader gave up before searching; retry and lead the lookup ourselves
+
+    def _lead(self, lookup, cache_key, title, artist, is_cancelled):
+        try:
+            # Only abandon the search for a cancelled caller if nobody else is waiting on it
+            lookup.result = self._lookup(cache_key, title, artist, lambda: is_cancelled() and not lookup.waiters)
+            lookup.cancelled = lookup.result is None
+            if lookup.result:
+                STREAM_CACHE.clear_failure(cache_key)
+        except Exception as e:
+            lookup.error = e
+            if isinstance(e, UnresolvableTrack) or (
+                    isinstance(e, yt_dlp.utils.DownloadError) and is_unavailable_error(e)):
+                ttl = STREAM_CACHE.record_failure(cache_key, str(e))
+                print(f"Error fetching YouTube stream for {title} - {artist}: {str(e)} (skipping for {ttl // 60} min)")
+            else:
+                # Timeouts, lost connectivity and throttling say nothing about the track; retry next time
+                print(f"Error fetching YouTube stream for {title} - {artist}: {str(e)}")
+        finally:
+            with self.lock:
+                del self.in_flight[cache_key]
+            lookup.done.set()
+        return lookup.result
+
+    def _lookup(self, cache_key, title, artist, is_cancelled):
+        video_id = STREAM_CACHE.get_video_id(cache_key)
+        if video_id:
+            # Only the signed URL is stale; re-extract the known video instead of searching
+            try:
+                info = YDL_POOL.extract_info(f"https://www.youtube.com/watch?v={video_id}")
+            except yt_dlp.utils.DownloadError as e:
+                if not is_unavailable_error(e):
+                    raise
+                print(f"Cached video {video_id} for {title} - {artist} is unavailable, searching again: {str(e)}")
+                STREAM_CACHE.delete_video_id(cache_key)
+                video_id = None
+        if not video_id:
+            if is_cancelled():
+                return None
+            query = f"{title} {artist} official audio"
+            entries = (YDL_POOL.extract_info(f"ytsearch:{query}") or {}).get('entries') or []
+            if not entries or not entries[0]:
+                raise UnresolvableTrack("no YouTube results")
+            info = entries[0]
+            STREAM_CACHE.put_video_id(cache_key, info['id'])
+        stream_url = info['url']
+        STREAM_CACHE.put(cache_key, stream_url)
+        return stream_url
+
+    def stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'known_failures': self.known_failures,
+                'in_flight': len(self.in_flight),
+            }
+
+RESOLVER = StreamResolver()
+
+# Write JSON through a temporary file so a crash never leaves a half-written file
+def write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+# Define a write-behind persister that batches cache changes off the GUI thread
+class WriteBehindPersister:
+    """Collects dirty keys and hands them to write_fn on a background thread.
+
+    mark_dirty() only records the key and arms a timer, so callers never
+    block on encoding or disk I/O; every change made within `delay` seconds
+    of the first one is written in a single batch.
+    """
+
+    def __init__(self, write_fn, delay, name="cache"):
+        self.write_fn = write_fn
+        self.delay = delay
+        self.name = name
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.dirty = set()
+        self.timer = None
+
+    def mark_dirty(self, key):
+        with self.lock:
+            self.dirty.add(key)
+            if not self.timer:
+                self.timer = threading.Timer(self.delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                keys, self.dirty = self.dirty, set()
+                self.timer = None
+            if not keys:
+                return
+            try:
+                self.write_fn(keys)
+            except Exception as e:
+                print(f"Error saving {self.name}: {str(e)}")
+                with self.lock:
+                    self.dirty |= keys
+
+    def close(self):
+        """Flush pending changes on a background thread without waiting for it.
+
+        The thread is not a daemon, so the interpreter still finishes the
+        write before exiting while the window closes right away.
+        """
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+        threading.Thread(target=self.flush, name=f"{self.name} flush").start()
+
+# Define a Spotify cache split into one JSON shard per key
+class ShardedCache:
+    """Spotify cache with one shard file per key, read on first access."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.max_bytes = max_bytes
+        self.lock = threading.RLock()
+        self.index = {}  # key -> {'file', 'timestamp', 'size'}, the only part loaded at startup
+        self.pending = {}  # key -> entry written by the next flush, pinned outside the LRU until then
+        self.lru = OrderedDict()  # key -> (entry, size), bounded by the shards' encoded size
+        self.lru_bytes = 0
+        self.writer = WriteBehindPersister(self.write_shards, SPOTIFY_CACHE_FLUSH_DELAY, "Spotify cache")
+
+    def load(self):
+        """Read the shard index, dropping entries older than CACHE_EXPIRY_DAYS."""
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r') as f:
+                    self.index = json.load(f)
+            except Exception as e:
+                print(f"Error loading Spotify cache index: {str(e)}")
+                self.index = {}
+        for key in [key for key, meta in self.index.items() if self.is_expired(meta)]:
+            del self.index[key]
+            self.writer.mark_dirty(key)
+
+    def migrate_json(self, json_path):
+        """Split a legacy monolithic spotify_cache.json into shards once."""
+        if not os.path.exists(json_path):
+            return
+        try:
+            with open(json_path, 'r') as f:
                 cached_data = json.load(f)
-                now = datetime.now()
-                SPOTIFY_CACHE = {
-                    key: value for key, value in cached_data.items()
-                    if datetime.fromisoformat(value['timestamp']) + timedelta(days=CACHE_EXPIRY_DAYS) > now
-                }
+            migrated = 0
+            for key, value in cached_data.items():
+                if not self.is_expired(value) and key not in self.index:
+                    self[key] = value
+                    migrated += 1
+            self.writer.flush()
+            os.replace(json_path, json_path + ".migrated")
+            print(f"Migrated {migrated} Spotify cache entries to {self.directory}")
+        except Exception as e:
+            print(f"Error migrating Spotify cache: {str(e)}")
+
+    @staticmethod
+    def is_expired(meta):
+        if meta.get('synced'):
+            return False  # Kept current by LibrarySync
+        return datetime.fromisoformat(meta['timestamp']) + timedelta(days=CACHE_EXPIRY_DAYS) <= datetime.now()
+
+    @staticmethod
+    def is_stale(entry):
+        """True once entry is old enough to be revalidated after it has been shown."""
+        return datetime.fromisoformat(entry['timestamp']) + timedelta(seconds=SPOTIFY_CACHE_SOFT_TTL) <= datetime.now()
+
+    def shard_path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest()[:20] + ".json")
+
+    def __contains__(self, key):
+        with self.lock:
+            meta = self.index.get(key)
+            return meta is not None and not self.is_expired(meta)
+
+    def __iter__(self):
+        with self.lock:
+            return iter(list(self.index))
+
+    def get(self, key, remember=True):
+        """Return the entry for key, reading its shard on first access, or None.
+
+        With remember=False a shard read from disk is not added to the LRU,
+        for bulk readers that would otherwise evict the entries in use.
+        """
+        with self.lock:
+            meta = self.index.get(key)
+            if meta is None or self.is_expired(meta):
+                return None
+            if key in self.pending:
+                return self.pending[key]
+            if key in self.lru:
+                self.lru.move_to_end(key)
+                return self.lru[key][0]
+        try:
+            with open(os.path.join(self.directory, meta['file']), 'rb') as f:
+                raw = f.read()
+            entry = json.loads(raw)
         except Exception as e:
-            print(f"Error loading Spotify cache: {str(e)}")
-            SPOTIFY_CACHE = {}
+            print(f"Error reading Spotify cache shard for {key}: {str(e)}")
+            with self.lock:
+                if self.index.get(key) is meta:
+                    del self.index[key]
+                    self.writer.mark_dirty(key)
+            return None
+        if remember:
+            with self.lock:
+                if self.index.get(key) is meta:
+                    self._remember(key, entry, len(raw))
+        return entry
+
+    def __getitem__(self, key):
+        entry = self.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def __setitem__(self, key, entry):
+        with self.lock:
+            self._forget(key)
+            self.pending[key] = entry
+            self.index[key] = {
+                'file': os.path.basename(self.shard_path(key)),
+                'timestamp': entry['timestamp'],
+                'size': 0,
+                'synced': entry.get('synced', False),
+            }
+        self.writer.mark_dirty(key)
+
+    def __delitem__(self, key):
+        with self.lock:
+            self._forget(key)
+            self.pending.pop(key, None)
+            del self.index[key]
+        self.writer.mark_dirty(key)
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+    def _remember(self, key, entry, size):
+        self._forget(key)
+        self.lru[key] = (entry, size)
+        self.lru_bytes += size
+        while self.lru_bytes > self.max_bytes and len(self.lru) > 1:
+            _, (_, evicted_size) = self.lru.popitem(last=False)
+            self.lru_bytes -= evicted_size
+
+    def _forget(self, key):
+        cached = self.lru.pop(key, None)
+        if cached:
+            self.lru_bytes -= cached[1]
+
+    def write_shards(self, keys):
+        """Write the shards of dirty keys and the index (runs on the persister thread)."""
+        for key in keys:
+            with self.lock:
+                entry = self.pending.get(key)
+                meta = self.index.get(key)
+            path = self.shard_path(key)
+            if entry is None:
+                if meta is None and os.path.exists(path):
+                    os.remove(path)
+                continue
+            data = json.dumps(entry)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            with self.lock:
+                # Only settle the entry if it was not replaced while we were writing
+                if self.pending.get(key) is entry:
+                    del self.pending[key]
+                    self.index[key]['size'] = len(data)
+                    self._remember(key, entry, len(data))
+        with self.lock:
+            index = dict(self.index)
+        write_json_atomic(self.index_path, index)
+
+    def close(self):
+        self.writer.close()
+
+SPOTIFY_CACHE = ShardedCache(SPOTIFY_CACHE_DIR, SPOTIFY_CACHE_MEMORY_BYTES)
+
+# Load the Spotify cache index and migrate the legacy single-file cache if present
+def load_spotify_cache():
+    SPOTIFY_CACHE.load()
+    SPOTIFY_CACHE.migrate_json(SPOTIFY_CACHE_FILE)
 
-# Save Spotify cache to file
-def save_spotify_cache():
-    try:
-        with open(SPOTIFY_CACHE_FILE, 'w') as f:
-            json.dump(SPOTIFY_CACHE, f)
-    except Exception as e:
-        print(f"Error saving Spotify cache: {str(e)}")
+# Define a pooled session for one host that caps concurrency and records metrics
+class HostSession(requests.Session):
+    """A requests.Session bound to one host.
+
+    Its adapter keeps up to HTTP_POOL_SIZE keep-alive connections, at most
+    `concurrency` requests run at once, and every request gets HTTP_TIMEOUT
+    unless the caller passes its own. Latency, errors and retries are
+    counted; connection reuse is read from the urllib3 pools.
+    """
+
+    def __init__(self, host, concurrency=HTTP_HOST_CONCURRENCY, pool_size=HTTP_POOL_SIZE):
+        super().__init__()
+        self.host = host
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.mount("https://", self.adapter)
+        self.mount("http://", self.adapter)
+        self.stats_lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+        self.retry_count = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = HTTP_TIMEOUT
+        with self.slots:
+            started = time.monotonic()
+            try:
+                return super().request(method, url, *args, **kwargs)
+            except requests.RequestException:
+                with self.stats_lock:
+                    self.error_count += 1
+                raise
+            finally:
+                elapsed = time.monotonic() - started
+                with self.stats_lock:
+                    self.request_count += 1
+                    self.total_latency += elapsed
+                    self.max_latency = max(self.max_latency, elapsed)
+
+    def spend_retry(self):
+        """Take one retry from the host's budget, False once it is used up."""
+        with self.stats_lock:
+            if self.retry_count >= HTTP_RETRY_BUDGET_MIN + HTTP_RETRY_BUDGET_RATIO * self.request_count:
+                return False
+            self.retry_count += 1
+            return True
+
+    def stats(self):
+        pools = self.adapter.poolmanager.pools
+        connections = sum(pools[key].num_connections for key in pools.keys())
+        pooled_requests = sum(pools[key].num_requests for key in pools.keys())
+        with self.stats_lock:
+            return {
+                'requests': self.request_count,
+                'errors': self.error_count,
+                'retries': self.retry_count,
+                'connections': connections,
+                'reused': max(0, pooled_requests - connections),
+                'avg_latency_ms': round(1000 * self.total_latency / self.request_count) if self.request_count else 0,
+                'max_latency_ms': round(1000 * self.max_latency),
+            }
+
+# Define the shared HTTP layer used for thumbnails and the Spotify API
+class HttpClient:
+    """Hands out one HostSession per host and retries transient failures.
+
+    Retries happen after connection errors and HTTP_RETRY_STATUSES, sleep
+    a jittered exponential backoff (or Retry-After when the server sends
+    one) and are bounded both per request and by the host's retry budget.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions = {}
+
+    def session(self, host):
+        with self.lock:
+            if host not in self.sessions:
+                self.sessions[host] = HostSession(host)
+            return self.sessions[host]
+
+    @staticmethod
+    def backoff(attempt, retry_after=None):
+        try:
+            delay = float(retry_after) if retry_after else 0
+        except (TypeError, ValueError):
+            delay = 0
+        return delay or random.uniform(0, HTTP_RETRY_BACKOFF * 2 ** attempt)
+
+    def request(self, method, url, retries=HTTP_MAX_RETRIES, **kwargs):
+        session = self.session(urlparse(url).netloc)
+        for attempt in range(retries + 1):
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == retries or not session.spend_retry():
+                    raise
+                delay = self.backoff(attempt)
+                print(f"Error requesting {session.host}: {str(e)}, retrying in {delay:.1f}s")
+            else:
+                if response.status_code not in HTTP_RETRY_STATUSES or attempt == retries or not session.spend_retry():
+                    return response
+                delay = self.backoff(attempt, response.headers.get('Retry-After'))
+                response.close()
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def stats(self):
+        with self.lock:
+            sessions = dict(self.sessions)
+        return {host: session.stats() for host, session in sessions.items()}
+
+    def close(self):
+        with self.lock:
+            sessions = list(self.sessions.values())
+        for session in sessions:
+            session.close()
+
+HTTP = HttpClient()
+
+# Call a Spotify API method, retrying rate limiting and server errors within the API host's retry budget
+def call_spotify(method, *args, is_cancelled=lambda: False, **kwargs):
+    for attempt in range(SPOTIFY_MAX_RETRIES + 1):
+        try:
+            return method(*args, **kwargs)
+        except spotipy.SpotifyException as e:
+            if (e.http_status not in HTTP_RETRY_STATUSES or attempt == SPOTIFY_MAX_RETRIES
+                    or not HTTP.session(SPOTIFY_API_HOST).spend_retry()):
+                raise
+            headers = getattr(e, 'headers', None) or {}
+            delay = min(HttpClient.backoff(attempt, headers.get('Retry-After')), SPOTIFY_MAX_RETRY_DELAY)
+            if e.http_status == 429:
+                print(f"Spotify rate limit hit, retrying in {delay:.1f}s")
+            else:
+                print(f"Spotify returned {e.http_status}, retrying in {delay:.1f}s")
+            # Sleep in slices so a cancelled load or a closing window does not wait out the delay
+            deadline = time.monotonic() + delay
+            while time.monotonic() < deadline:
+                if is_cancelled():
+                    raise
+                time.sleep(min(0.1, deadline - time.monotonic()))
+
+# Fetch every item of a Spotify paging endpoint
+def fetch_all_pages(fetch_page, limit, workers=SPOTIFY_PAGE_WORKERS, on_page=None, is_cancelled=lambda: False):
+    """Return all items from fetch_page(limit=..., offset=...) in order.
+
+    The first response reports `total`, so the remaining offsets are known up
+    front and fetched concurrently by a bounded pool, then reassembled in
+    offset order. on_page receives each page's items in that same order as
+    soon as they are available; once is_cancelled() is true the remaining
+    pages are abandoned and the items so far are returned.
+    """
+    first = call_spotify(fetch_page, limit=limit, offset=0, is_cancelled=is_cancelled)
+    items = list(first["items"])
+    if on_page:
+        on_page(first["items"])
+    total = first.get("total") or 0
+    offsets = list(range(limit, total, limit)) if len(first["items"]) == limit else []
+    if offsets and not is_cancelled():
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=min(workers, len(offsets)))
+        try:
+            futures = [
+                executor.submit(call_spotify, fetch_page, limit=limit, offset=offset, is_cancelled=is_cancelled)
+                for offset in offsets
+            ]
+            for future in futures:
+                if is_cancelled():
+                    break
+                page_items = future.result()["items"]
+                items.extend(page_items)
+                if on_page:
+                    on_page(page_items)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    return items
+
+# Define the incremental sync engine for cached playlists and liked songs
+class LibrarySync:
+    """Brings cached library data up to date with as few Spotify calls as possible.
+
+    Playlist tracks are only refetched when the snapshot_id reported by the
+    cheap current_user_playlists listing differs from the cached one. Liked
+    songs are returned newest first, so only items saved after the newest
+    cached added_at are fetched; if the resulting count disagrees with the
+    reported total (a track was removed), the list is refetched in full.
+    """
+
+    def __init__(self, sp):
+        self.sp = sp
+
+    def fetch_playlists(self, on_page=None, is_cancelled=lambda: False):
+        return fetch_all_pages(self.sp.current_user_playlists, limit=50, on_page=on_page, is_cancelled=is_cancelled)
+
+    def fetch_playlist_tracks(self, playlist_id, on_page=None, is_cancelled=lambda: False):
+        return self._fetch_records(
+            lambda limit, offset: self.sp.playlist_tracks(
+                playlist_id, fields=SPOTIFY_PLAYLIST_TRACK_FIELDS, limit=limit, offset=offset, market=SPOTIFY_MARKET
+            ),
+            100, on_page, is_cancelled
+        )
+
+    def _fetch_records(self, fetch_page, limit, on_page, is_cancelled):
+        """Fetch all pages as TrackRecords, handing each page's records to on_page."""
+        tracks = []
+
+        def add_page(items):
+            records = records_from_spotify(items)
+            tracks.extend(records)
+            if on_page:
+                on_page(records)
+
+        fetch_all_pages(fetch_page, limit, on_page=add_page, is_cancelled=is_cancelled)
+        return tracks
+
+    @staticmethod
+    def playlist_is_current(cached, playlist):
+        return bool(cached and playlist and playlist.get("snapshot_id")
+                    and cached.get('snapshot_id') == playlist["snapshot_id"])
+
+    def fetch_liked_tracks(self, on_page=None, is_cancelled=lambda: False):
+        return self._fetch_records(
+            lambda limit, offset: self.sp.current_user_saved_tracks(limit=limit, offset=offset, market=SPOTIFY_MARKET),
+            50, on_page, is_cancelled
+        )
+
+    def sync_liked_tracks(self, cached_tracks, on_page=None, is_cancelled=lambda: False):
+        """Return (tracks, changed) with liked songs saved since cached_tracks merged in.
+
+        on_page only sees pages when the list has to be fetched in full.
+        """
+        newest = cached_tracks[0].added_at if cached_tracks else None
+        if not newest:
+            return self.fetch_liked_tracks(on_page, is_cancelled), True
+        new_tracks = []
+        offset = 0
+        limit = 50
+        while not is_cancelled():
+            page = call_spotify(self.sp.current_user_saved_tracks, limit=limit, offset=offset, market=SPOTIFY_MARKET,
+                                is_cancelled=is_cancelled)
+            page_tracks = records_from_spotify(page["items"])
+            fresh = [track for track in page_tracks if track.added_at and track.added_at > newest]
+            new_tracks.extend(fresh)
+            if len(fresh) < len(page["items"]) or len(page["items"]) < limit:
+                break
+            offset += limit
+        else:
+            return cached_tracks, False
+        if len(new_tracks) + len(cached_tracks) != page["total"]:
+            print("Liked songs changed beyond new additions, refetching in full")
+            return self.fetch_liked_tracks(on_page, is_cancelled), True
+        return new_tracks + cached_tracks, bool(new_tracks)
 
 # Ensure download folder exists
 if not os.path.exists(DOWNLOAD_FOLDER):
     os.makedirs(DOWNLOAD_FOLDER)
 
+# Define a token bucket that caps how often lookups may start
+class RateLimiter:
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, is_cancelled=lambda: False):
+        """Block until a token is available; return False if cancelled while waiting."""
+        while not is_cancelled():
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(min(delay, 0.25))
+        return False
+
+WARM_RATE_LIMITER = RateLimiter(WARM_REQUESTS_PER_SECOND)
+
+# Resolve many tracks into the stream cache with bounded parallelism
+def warm_tracks(tracks, is_cancelled=lambda: False, on_progress=None, workers=WARM_WORKERS):
+    """Resolve (title, artist) pairs into STREAM_CACHE and return (resolved, failed).
+
+    Tracks that already have a fresh cached URL are counted without a lookup,
+    so a cancelled or interrupted job resumes where it stopped when it is run
+    again. Network lookups share WARM_RATE_LIMITER to avoid YouTube throttling.
+    on_progress(done, total) is called from the worker threads.
+    """
+    total = len(tracks)
+    counts = {'done': 0, 'resolved': 0, 'failed': 0}
+    lock = threading.Lock()
+
+    def warm_one(title, artist):
+        if is_cancelled():
+            return
+        if STREAM_CACHE.get(stream_cache_key(title, artist), margin=STREAM_URL_REFRESH_MARGIN):
+            ok = True
+        elif RESOLVER.known_failure(title, artist):
+            ok = False
+        elif not WARM_RATE_LIMITER.acquire(is_cancelled):
+            return
+        else:
+            ok = RESOLVER.resolve(title, artist, is_cancelled) is not None
+        with lock:
+            counts['done'] += 1
+            counts['resolved' if ok else 'failed'] += 1
+            done = counts['done']
+        if on_progress:
+            on_progress(done, total)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(warm_one, title, artist) for title, artist in tracks]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error warming track: {str(e)}")
+    return counts['resolved'], counts['failed']
+
+# Pick the smallest Spotify image at least size pixels wide, or the largest if none is
+def pick_image_url(images, size=ALBUM_ART_SIZE):
+    if not images:
+        return ""
+    # Spotify leaves width unset for some images; treat those as large
+    by_width = sorted(images, key=lambda image: image.get("width") or sys.maxsize)
+    for image in by_width:
+        if (image.get("width") or sys.maxsize) >= size:
+            return image["url"]
+    return by_width[-1]["url"]
+
+# Define a compact track record shared by the tables, queue and caches
+class TrackRecord:
+    """Only the track fields Pythify renders or queues.
+
+    Spotify's track objects carry market lists, external URLs and full album
+    and artist objects; a slotted record with interned artist and album
+    strings replaces them everywhere a track is held in memory or cached.
+    Records compare equal by title and artist, like the queue entries they
+    replace.
+    """
+    __slots__ = ('title', 'artist', 'album', 'duration_ms', 'image_url', 'id', 'added_at')
+
+    def __init__(self, title, artist, album="", duration_ms=0, image_url="", id=None, added_at=None):
+        self.title = title
+        self.artist = sys.intern(artist)
+        self.album = sys.intern(album)
+        self.duration_ms = duration_ms
+        self.image_url = image_url
+        self.id = id
+        self.added_at = added_at
+
+    @classmethod
+    def from_spotify(cls, item):
+        """Build a record from a Spotify track or saved/playlist item; None if the item has no track."""
+        track = item["track"] if "track" in item else item
+        if not track:
+            return None
+        album = track.get("album") or {}
+        return cls(
+            track["name"],
+            ", ".join([artist["name"] for artist in track.get("artists", [])]),
+            album.get("name", ""),
+            track.get("duration_ms", 0),
+            pick_image_url(album.get("images")),
+            track.get("id"),
+            item.get("added_at")
+        )
+
+    @classmethod
+    def from_row(cls, row):
+        # Caches written before TrackRecord existed hold raw Spotify items
+        if isinstance(row, dict):
+            return cls.from_spotify(row)
+        return cls(*row)
+
+    def to_row(self):
+        return [self.title, self.artist, self.album, self.duration_ms, self.image_url, self.id, self.added_at]
+
+    def duration_text(self):
+        if not self.duration_ms:
+            return "N/A"
+        minutes = self.duration_ms // 60000
+        seconds = (self.duration_ms % 60000) // 1000
+        return f"{minutes}:{seconds:02d}"
+
+    def __eq__(self, other):
+        if not isinstance(other, TrackRecord):
+            return NotImplemented
+        return self.title == other.title and self.artist == other.artist
+
+    def __hash__(self):
+        return hash((self.title, self.artist))
+
+    def display_key(self):
+        """Everything a table row shows, for diffing refreshed views."""
+        return (self.title, self.artist, self.album, self.duration_ms)
+
+    def __repr__(self):
+        return f"TrackRecord({self.title!r}, {self.artist!r})"
+
+# Convert Spotify items or cached rows into track records, skipping empty items
+def records_from_spotify(items):
+    return [record for record in map(TrackRecord.from_spotify, items) if record]
+
+def records_from_rows(rows):
+    return [record for record in map(TrackRecord.from_row, rows) if record]
+
+# Build the search cache key for a query and page
+def search_cache_key(query, page):
+    """Normalize case and whitespace so repeated searches map to the same entry."""
+    return f"{' '.join(query.split()).casefold()}|{page}"
+
+# Define a cache for recent search result pages
+class SearchCache:
+    """Search result pages keyed by normalized query and page number.
+
+    Entries expire after `ttl` seconds and the least recently used are
+    evicted beyond `max_entries`. The cache is small, so the write-behind
+    persister rewrites it as a single JSON file.
+    """
+
+    def __init__(self, path, max_entries, ttl):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (timestamp, total, tracks)
+        self.hits = 0
+        self.misses = 0
+        self.writer = WriteBehindPersister(self.write, SPOTIFY_CACHE_FLUSH_DELAY, "search cache")
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            now = time.time()
+            with self.lock:
+                for key, timestamp, total, rows in data:
+                    if timestamp + self.ttl > now:
+                        self.entries[key] = (timestamp, total, records_from_rows(rows))
+        except Exception as e:
+            print(f"Error loading search cache: {str(e)}")
+
+    def get(self, query, page):
+        """Return (total, tracks) for a fresh cached page, or None."""
+        key = search_cache_key(query, page)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] + self.ttl > time.time():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+            if entry:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, query, page, total, tracks):
+        key = search_cache_key(query, page)
+        with self.lock:
+            self.entries[key] = (time.time(), total, tracks)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        self.writer.mark_dirty(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        self.writer.mark_dirty(None)  # write() rewrites the whole file, whatever the key
+
+    def write(self, keys):
+        with self.lock:
+            entries = list(self.entries.items())
+        write_json_atomic(self.path, [
+            [key, timestamp, total, [track.to_row() for track in tracks]]
+            for key, (timestamp, total, tracks) in entries
+        ])
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'entries': len(self.entries),
+            }
+
+    def close(self):
+        self.writer.close()
+
+SEARCH_CACHE = SearchCache(SEARCH_CACHE_FILE, SEARCH_CACHE_MAX_ENTRIES, SEARCH_CACHE_TTL)
+
+# Split text into the casefolded words the local search index matches on
+def search_tokens(text):
+    return re.findall(r"\w+", text.casefold())
+
+# Define an index over every track already known locally
+class LocalSearchIndex:
+    """Prefix search over title, artist and album of cached and downloaded tracks."""
+
+    def __init__(self):
+        self.lock = threading.Lock()  # Held only while postings change, so GUI searches never wait for tokenizing
+        self.docs = {}  # doc id -> TrackRecord
+        self.doc_ids = {}  # TrackRecord -> doc id, records compare by title and artist
+        self.doc_sources = {}  # doc id -> sources containing the track
+        self.source_docs = {}  # source (a cached playlist, liked songs, the download folder) -> doc ids
+        self.postings = {}  # word -> doc ids
+        self.words = []  # Sorted postings keys for bisecting query prefixes ("beat" finds "beatles"), rebuilt lazily
+        self.words_dirty = False
+        self.next_id = 0
+        self.closed = False
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)  # Applies updates in order
+
+    @staticmethod
+    def doc_tokens(track):
+        return set(search_tokens(f"{track.title} {track.artist} {track.album}"))
+
+    def submit(self, fn, *args):
+        """Run fn(*args) on the index thread after every update submitted before it."""
+        if not self.closed:
+            self.executor.submit(self._run, fn, args)
+
+    @staticmethod
+    def _run(fn, args):
+        try:
+            fn(*args)
+        except Exception as e:
+            print(f"Error updating local search index: {str(e)}")
+
+    def index_source(self, source, tracks):
+        """Make source contain exactly tracks (runs on the index thread)."""
+        # Only the index thread changes the index, so it can read it without the lock.
+        # Tracks already indexed from any source are not tokenized again.
+        new_tracks = {track: None for track in tracks if track not in self.doc_ids}
+        tokens = {track: self.doc_tokens(track) for track in new_tracks}
+        with self.lock:
+            for track, words in tokens.items():
+                doc_id = self.next_id
+                self.next_id += 1
+                self.docs[doc_id] = track
+                self.doc_ids[track] = doc_id
+                self.doc_sources[doc_id] = set()
+                for word in words:
+                    if word not in self.postings:
+                        self.postings[word] = set()
+                        self.words_dirty = True
+                    self.postings[word].add(doc_id)
+            doc_ids = set()
+            for track in tracks:
+                doc_id = self.doc_ids[track]
+                self.doc_sources[doc_id].add(source)
+                doc_ids.add(doc_id)
+            for doc_id in self.source_docs.get(source, set()) - doc_ids:
+                self._drop_source(doc_id, source)
+            self.source_docs[source] = doc_ids
+
+    def remove_source(self, source):
+        with self.lock:
+            for doc_id in self.source_docs.pop(source, ()):
+                self._drop_source(doc_id, source)
+
+    def retain(self, sources):
+        """Remove every source not in sources, e.g. the tracks of an account that logged out."""
+        for source in [source for source in self.source_docs if source not in sources]:
+            self.remove_source(source)
+
+    def _drop_source(self, doc_id, source):
+        sources = self.doc_sources[doc_id]
+        sources.discard(source)
+        if sources:
+            return
+        track = self.docs.pop(doc_id)
+        del self.doc_sources[doc_id]
+        del self.doc_ids[track]
+        for word in self.doc_tokens(track):
+            postings = self.postings[word]
+            postings.discard(doc_id)
+            if not postings:
+                del self.postings[word]
+                self.words_dirty = True
+
+    def close(self):
+        self.closed = True  # Also stops build_local_index between sources
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _prefix_matches(self, prefix):
+        matches = set()
+        for i in range(bisect.bisect_left(self.words, prefix), len(self.words)):
+            if not self.words[i].startswith(prefix):
+                break
+            matches |= self.postings[self.words[i]]
+        return matches
+
+    def search(self, query, limit=LOCAL_SEARCH_LIMIT):
+        """Return up to limit tracks matching every word of query as a prefix, in indexing order."""
+        query_words = set(search_tokens(query))
+        if not query_words:
+            return []
+        with self.lock:
+            if self.words_dirty:
+                self.words = sorted(self.postings)
+                self.words_dirty = False
+            result = None
+            # Longer words match fewer documents, so the intersection shrinks fastest
+            for word in sorted(query_words, key=len, reverse=True):
+                matches = self._prefix_matches(word)
+                result = matches if result is None else result & matches
+                if not result:
+                    return []
+            return [self.docs[doc_id] for doc_id in sorted(result)[:limit]]
+
+    def __len__(self):
+        with self.lock:
+            return len(self.docs)
+
+LOCAL_INDEX = LocalSearchIndex()
+
+# List the tracks in the download folder as (filename, TrackRecord)
+def downloaded_tracks():
+    if not os.path.exists(DOWNLOAD_FOLDER):
+        return []
+    tracks = []
+    for filename in os.listdir(DOWNLOAD_FOLDER):
+        if not filename.endswith('.mp3'):
+            continue
+        name_without_ext = os.path.splitext(filename)[0]
+        if " - " in name_without_ext:
+            title, artist = name_without_ext.split(" - ", 1)
+        else:
+            title = name_without_ext
+            artist = "Unknown"
+        tracks.append((filename, TrackRecord(title, artist, "Downloaded")))
+    return tracks
+
+# Re-index the download folder (runs on the local index thread)
+def index_downloaded_tracks():
+    LOCAL_INDEX.index_source(LOCAL_SEARCH_DOWNLOADS, [track for _, track in downloaded_tracks()])
+
+# Fill the local search index from the download folder and cached track lists
+def build_local_index():
+    started = time.monotonic()
+    try:
+        index_downloaded_tracks()
+        for cache_key in SPOTIFY_CACHE:
+            if LOCAL_INDEX.closed:
+                return
+            if cache_key.startswith(("liked_music_", "playlist_")):
+                # Read past the shard LRU; indexing every list must not evict the ones in use
+                cached = SPOTIFY_CACHE.get(cache_key, remember=False)
+                if cached:
+                    LOCAL_INDEX.index_source(cache_key, records_from_rows(cached['data']))
+        print(f"Indexed {len(LOCAL_INDEX)} tracks for local search in {time.monotonic() - started:.2f}s")
+    except Exception as e:
+        print(f"Error building local search index: {str(e)}")
+
+# Define a background prefetcher for stream URLs of upcoming tracks
+class StreamPrefetcher:
+    """Resolves upcoming queue entries into STREAM_CACHE on a daemon thread.
+
+    schedule() replaces the pending work and bumps a generation counter, so
+    tracks from a queue that has since changed are dropped and a search that
+    has not started yet for them is skipped.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.pending = []
+        self.generation = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def schedule(self, tracks):
+        with self.cond:
+            self.generation += 1
+            self.pending = [(track.title, track.artist) for track in tracks]
+            self.cond.notify()
+
+    def cancel(self):
+        self.schedule([])
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                title, artist = self.pending.pop(0)
+                generation = self.generation
+            try:
+                RESOLVER.resolve(title, artist, lambda: generation != self.generation)
+            except Exception as e:
+                print(f"Error prefetching {title} - {artist}: {str(e)}")
+
 # Define a dialog for Spotify authentication
 class SpotifyAuthDialog(QDialog):
     def __init__(self, parent=None):
@@ -153,9 +1559,7 @@ class QueueDialog(QDialog):
     def update_queue(self, queue):
         self.queue_list.clear()
         for i, track in enumerate(queue, 1):
-            title = track["title"]
-            artist = track["artist"]
-            self.queue_list.addItem(f"{i}. {title} - {artist}")
+            self.queue_list.addItem(f"{i}. {track.title} - {track.artist}")
 
 # Define a dialog to show download progress
 class DownloadProgressDialog(QDialog):
@@ -220,7 +1624,7 @@ class DownloadWorker(QThread):
             output_file = os.path.join(self.download_folder, f"{title} - {artist}.mp3")
 
             # Fetch stream URL
-            stream_url = self.fetch_youtube_stream(title, artist)
+            stream_url = RESOLVER.resolve(self.title, self.artist, lambda: self.cancelled)
             if not stream_url or self.cancelled:
                 self.download_finished.emit(f"{title} - {artist}", False)
                 return
@@ -270,37 +1674,516 @@ class DownloadWorker(QThread):
             if self.vlc_instance:
                 self.vlc_instance.release()
 
-    def fetch_youtube_stream(self, title, artist):
-        cache_key = f"{title.lower()} - {artist.lower()}"
-        if cache_key in STREAM_CACHE:
-            return STREAM_CACHE[cache_key]['url']
-        
-        query = f"{title} {artist} official audio"
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'quiet': True,
-            'noplaylist': True,
-            'no_progress': True,
-        }
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            try:
-                info = ydl.extract_info(f"ytsearch:{query}", download=False)
-                stream_url = info['entries'][0]['url']
-                STREAM_CACHE[cache_key] = {
-                    'url': stream_url,
-                    'timestamp': datetime.now().isoformat()
-                }
-                save_stream_cache()
-                return stream_url
-            except Exception as e:
-                print(f"Error fetching YouTube stream: {str(e)}")
-                return None
-
     def cancel(self):
         self.cancelled = True
         if self.vlc_player:
             self.vlc_player.stop()
 
+# Define a worker thread that warms the stream cache for a playlist
+class PlaylistWarmWorker(QThread):
+    progress_updated = pyqtSignal(int, int)  # Signal for progress updates (done, total)
+    warm_finished = pyqtSignal(int, int, bool)  # Signal for completion (resolved, failed, cancelled)
+
+    def __init__(self, tracks):
+        super().__init__()
+        self.tracks = tracks
+        self.cancelled = False
+
+    def run(self):
+        resolved, failed = warm_tracks(
+            self.tracks,
+            is_cancelled=lambda: self.cancelled,
+            on_progress=self.progress_updated.emit
+        )
+        self.warm_finished.emit(resolved, failed, self.cancelled)
+
+    def cancel(self):
+        self.cancelled = True
+
+# Define a worker thread that loads Spotify library data off the GUI thread
+class LibraryLoader(QThread):
+    page_loaded = pyqtSignal(int, object)  # Signal for each page as it arrives (generation, items)
+    load_finished = pyqtSignal(int, object, str)  # Signal for completion (generation, result, error)
+
+    def __init__(self, generation, fetch):
+        super().__init__()
+        self.generation = generation
+        self.fetch = fetch  # Called as fetch(on_page, is_cancelled) and returns the full result
+        self.cancelled = False
+
+    def run(self):
+        try:
+            result, error = self.fetch(self.emit_page, lambda: self.cancelled), ""
+        except Exception as e:
+            result, error = None, str(e)
+        if not self.cancelled:
+            self.load_finished.emit(self.generation, result, error)
+
+    def emit_page(self, items):
+        if not self.cancelled:
+            self.page_loaded.emit(self.generation, items)
+
+    def cancel(self):
+        self.cancelled = True
+
+# Define an album art loader that fetches, decodes and caches off the GUI thread
+class AlbumArtLoader(QObject):
+    """Album art by image URL, delivered as a QPixmap to a callback on the GUI thread.
+
+    Workers read the downscaled copy from the disk cache, or download the
+    image through HTTP, decode and scale it with QImage and save the result
+    there. The GUI thread only turns the small QImage into a QPixmap, which
+    stays in a byte-bounded LRU. Concurrent requests for one URL share a
+    single fetch.
+    """
+    image_loaded = pyqtSignal(str, object)  # Signal for a fetched image (url, QImage or None)
+
+    def __init__(self, directory, max_bytes, disk_bytes, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.disk_bytes = disk_bytes
+        self.lru = OrderedDict()  # url -> (QPixmap, size in bytes)
+        self.lru_bytes = 0
+        self.waiting = {}  # url -> callbacks waiting for its fetch
+        self.lock = threading.Lock()  # Guards the counters updated by workers
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.downloads = 0
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=ALBUM_ART_WORKERS)
+        self.image_loaded.connect(self.on_image_loaded)  # Queued onto the GUI thread when emitted by a worker
+        os.makedirs(self.directory, exist_ok=True)
+        self.executor.submit(self.trim_disk_cache)
+
+    def path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf-8')).hexdigest()[:20] + ".jpg")
+
+    def request(self, url, callback=None):
+        """Call callback(pixmap) with the art at url, or callback(None) if it cannot be loaded."""
+        cached = self.lru.get(url)
+        if cached:
+            self.lru.move_to_end(url)
+            self.memory_hits += 1
+            if callback:
+                callback(cached[0])
+            return
+        if url in self.waiting:
+            if callback:
+                self.waiting[url].append(callback)
+            return
+        self.waiting[url] = [callback] if callback else []
+        self.executor.submit(self.fetch, url)
+
+    def fetch(self, url):
+        """Load the downscaled image for url (runs on a worker thread).
+
+        Always emits image_loaded, with None on failure, so the callbacks
+        waiting for url are released and a later request can try again.
+        """
+        path = self.path(url)
+        image = None
+        try:
+            image = QImage(path) if os.path.exists(path) else QImage()
+            if not image.isNull():
+                with self.lock:
+                    self.disk_hits += 1
+                try:
+                    os.utime(path)  # Mark as recently used for trim_disk_cache
+                except OSError:
+                    pass  # Trimmed since it was read; the image is already loaded
+            else:
+                response = HTTP.get(url)
+                response.raise_for_status()
+                image = QImage.fromData(response.content)
+                if image.isNull():
+                    raise ValueError("undecodable image data")
+                image = image.scaled(ALBUM_ART_SIZE, ALBUM_ART_SIZE, Qt.AspectRatioMode.KeepAspectRatio,
+                                     Qt.TransformationMode.SmoothTransformation)
+                with self.lock:
+                    self.downloads += 1
+                tmp_path = f"{path}.tmp"
+                try:
+                    if image.save(tmp_path, "JPG", 90):
+                        os.replace(tmp_path, path)
+                except OSError as e:
+                    print(f"Error caching album art: {str(e)}")  # Still show the downloaded image
+        except Exception as e:
+            print(f"Error loading album art: {str(e)}")
+            image = None
+        finally:
+            self.image_loaded.emit(url, image)
+
+    def on_image_loaded(self, url, image):
+        pixmap = QPixmap.fromImage(image) if image is not None else None
+        if pixmap is not None:
+            self.remember(url, pixmap)
+        for callback in self.waiting.pop(url, []):
+            callback(pixmap)
+
+    def remember(self, url, pixmap):
+        size = pixmap.width() * pixmap.height() * pixmap.depth() // 8
+        self.lru[url] = (pixmap, size)
+        self.lru_bytes += size
+        while self.lru_bytes > self.max_bytes and len(self.lru) > 1:
+            _, (_, evicted_size) = self.lru.popitem(last=False)
+            self.lru_bytes -= evicted_size
+
+    def trim_disk_cache(self):
+        """Delete the least recently used images beyond disk_bytes (runs on a worker thread)."""
+        try:
+            files = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum([size for _, size, _ in files])
+            for _, size, path in sorted(files):
+                if total <= self.disk_bytes:
+                    break
+                os.remove(path)
+                total -= size
+        except Exception as e:
+            print(f"Error trimming album art cache: {str(e)}")
+
+    def stats(self):
+        with self.lock:
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'downloads': self.downloads,
+                'memory_entries': len(self.lru),
+                'memory_bytes': self.lru_bytes,
+            }
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+# Columns of the content view as (header, cell text, numeric sort key) triples;
+# columns without a numeric key sort by their casefolded text
+TRACK_COLUMNS = [
+    ("Title", lambda track: track.title, None),
+    ("Artist", lambda track: track.artist, None),
+    ("Album", lambda track: track.album, None),
+    ("Duration", TrackRecord.duration_text, lambda track: track.duration_ms or 0),
+]
+ARTIST_COLUMNS = [
+    ("Artist", lambda artist: artist["name"], None),
+    ("Genres", lambda artist: ", ".join(artist["genres"][:3]), None),
+    ("Popularity", lambda artist: str(artist["popularity"]), lambda artist: artist["popularity"]),
+    ("", lambda artist: "", None),
+]
+ALBUM_COLUMNS = [
+    ("Album", lambda item: item["album"]["name"], None),
+    ("Artist", lambda item: ", ".join([artist["name"] for artist in item["album"]["artists"]]), None),
+    ("Release Date", lambda item: item["album"]["release_date"], None),
+    ("Tracks", lambda item: str(item["album"]["total_tracks"]), lambda item: item["album"]["total_tracks"]),
+]
+
+# Define a columnar store of the rows behind the content view
+class ColumnStore:
+    """Rows of the content view with per-column sort keys for sorting and filtering.
+
+    Numeric columns are held in array('q') and text columns as interned,
+    casefolded strings, each built the first time a view sorts by it.
+    Sorting yields a permutation of row indices, cached per column and
+    direction and merged with appended rows instead of being recomputed.
+    """
+
+    def __init__(self, rows, columns):
+        self.rows = list(rows)
+        self.columns = columns
+        self.keys = {}  # Column -> sort key per row
+        self.orders = {}  # (column, descending) -> row indices in sorted order
+        self.search_text = None  # Casefolded text per row, built on the first filter
+
+    def build_keys(self, column, rows):
+        _, text, key = self.columns[column]
+        if key:
+            return array.array('q', [key(row) for row in rows])
+        return [sys.intern(text(row).casefold()) for row in rows]
+
+    def row_text(self, row):
+        # Filters match the text columns; durations and counts are left out
+        return "\n".join([text(row) for _, text, key in self.columns if not key]).casefold()
+
+    def sort_order(self, column, descending):
+        order = self.orders.get((column, descending))
+        if order is None:
+            opposite = self.orders.get((column, not descending))
+            if opposite is not None:
+                # Flipping the direction only reverses the cached order
+                order = opposite[::-1]
+            else:
+                if column not in self.keys:
+                    self.keys[column] = self.build_keys(column, self.rows)
+                order = sorted(range(len(self.rows)), key=self.keys[column].__getitem__, reverse=descending)
+            self.orders[(column, descending)] = order
+        return order
+
+    def extend(self, rows):
+        start = len(self.rows)
+        self.rows.extend(rows)
+        for column, keys in self.keys.items():
+            keys.extend(self.build_keys(column, rows))
+        if self.search_text is not None:
+            self.search_text.extend([self.row_text(row) for row in rows])
+        for (column, descending), order in self.orders.items():
+            # The cached order is one sorted run, so timsort merges the new rows in about linear time
+            order.extend(range(start, len(self.rows)))
+            order.sort(key=self.keys[column].__getitem__, reverse=descending)
+
+    def remove(self, row):
+        del self.rows[row]
+        for keys in self.keys.values():
+            del keys[row]
+        if self.search_text is not None:
+            del self.search_text[row]
+        self.orders.clear()
+
+    def select(self, column=None, descending=False, text=""):
+        """Row indices sorted by column and limited to rows containing text; None for all rows in order."""
+        if column is None and not text:
+            return None
+        order = self.sort_order(column, descending) if column is not None else range(len(self.rows))
+        if not text:
+            return list(order)
+        if self.search_text is None:
+            self.search_text = [self.row_text(row) for row in self.rows]
+        needle = text.casefold()
+        search_text = self.search_text
+        return [i for i in order if needle in search_text[i]]
+
+# Define the table model behind the content view
+class ContentTableModel(QAbstractTableModel):
+    """Rows of the content view, turned into cell text only when the view paints them.
+
+    A view of any size costs one list of row references; the QTableView
+    asks for the visible cells alone. Playable views get a trailing column
+    whose play button is painted by PlayButtonDelegate.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.columns = TRACK_COLUMNS
+        self.store = ColumnStore([], TRACK_COLUMNS)
+        self.rows = self.store.rows
+        self.order = None  # Row indices shown when sorted or filtered, None for all rows as loaded
+        self.sort_column = None
+        self.descending = False
+        self.filter_text = ""
+        self.playable = True
+        self.message = None  # Placeholder shown as the only row, e.g. for an empty download folder
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self.message is not None:
+            return 1
+        return len(self.rows) if self.order is None else len(self.order)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.columns) + (1 if self.playable else 0)
+
+    def is_play_column(self, column):
+        return self.playable and column == len(self.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if self.message is not None:
+                return self.message if column == 0 else ""
+            if self.is_play_column(column):
+                return "▶"
+            return self.columns[column][1](self.rows[self.source_row(index.row())])
+        if role == Qt.ItemDataRole.TextAlignmentRole and self.is_play_column(column):
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.columns[section][0] if section < len(self.columns) else ""
+        return None
+
+    def text(self, row, column):
+        return self.data(self.index(row, column)) or ""
+
+    def source_row(self, row):
+        """Index into the loaded rows of the row shown at position row."""
+        return row if self.order is None else self.order[row]
+
+    def displayed_rows(self):
+        if self.order is None:
+            return list(self.rows)
+        return [self.rows[i] for i in self.order]
+
+    def set_rows(self, rows):
+        self.store = ColumnStore(rows, self.columns)
+        self.rows = self.store.rows
+
+    def reset(self, rows, columns=TRACK_COLUMNS, playable=True):
+        self.beginResetModel()
+        if columns is not self.columns:
+            self.sort_column = None
+        self.columns = columns
+        self.playable = playable
+        self.set_rows(rows)
+        self.order = self.store.select(self.sort_column, self.descending, self.filter_text)
+        self.message = None
+        self.endResetModel()
+
+    def show_message(self, message):
+        self.beginResetModel()
+        self.columns = TRACK_COLUMNS
+        self.playable = False
+        self.set_rows([])
+        self.order = None
+        self.message = message
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        sort_column = column if 0 <= column < len(self.columns) else None
+        descending = order == Qt.SortOrder.DescendingOrder
+        if (sort_column, descending) == (self.sort_column, self.descending):
+            return
+        self.sort_column, self.descending = sort_column, descending
+        self.apply_order()
+
+    def set_filter(self, text):
+        self.filter_text = text
+        self.apply_order()
+
+    def apply_order(self, rows=None, row_map=None):
+        """Re-sort and re-filter as a layout change, so selections follow their rows.
+
+        If rows is given it replaces the loaded rows; row_map then maps old
+        row indices to new ones, and rows missing from it lose selection.
+        """
+        if self.message is not None:
+            return
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_rows = [self.source_row(index.row()) for index in old_indexes]
+        if rows is not None:
+            self.set_rows(rows)
+        self.order = self.store.select(self.sort_column, self.descending, self.filter_text)
+        if old_indexes:
+            if row_map is not None:
+                old_rows = [row_map.get(row) for row in old_rows]
+            positions = {row: i for i, row in enumerate(self.order)} if self.order is not None else None
+            new_indexes = []
+            for index, row in zip(old_indexes, old_rows):
+                position = row if positions is None or row is None else positions.get(row)
+                new_indexes.append(QModelIndex() if position is None else self.index(position, index.column()))
+            self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    def append(self, rows):
+        """Add rows at the end, e.g. a page that just arrived, without touching the others."""
+        if not rows:
+            return
+        if self.order is not None:
+            self.store.extend(rows)
+            self.apply_order()
+            return
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self.store.extend(rows)
+        self.endInsertRows()
+
+    def remove(self, row):
+        source_row = self.source_row(row)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.store.remove(source_row)
+        if self.order is not None:
+            self.order = [i - (i > source_row) for i in self.order if i != source_row]
+        self.endRemoveRows()
+
+    def update_rows(self, new_rows, key):
+        """Patch the model to new_rows, signalling only the rows that differ by key.
+
+        Returns the number of rows rewritten, inserted or removed.
+        """
+        old_keys = [key(row) for row in self.rows]
+        new_keys = [key(row) for row in new_rows]
+        if old_keys == new_keys:
+            if self.order is None:
+                self.set_rows(new_rows)
+            else:
+                self.apply_order(new_rows)
+            return 0
+        opcodes = difflib.SequenceMatcher(None, old_keys, new_keys, autojunk=False).get_opcodes()
+        if self.order is not None:
+            # Sorted or filtered rows don't line up with the loaded ones, so re-sort as a
+            # layout change; rows still present, even if moved, keep their selection
+            new_positions = {}
+            for j in reversed(range(len(new_keys))):
+                new_positions.setdefault(new_keys[j], []).append(j)
+            row_map = {}
+            for i, row_key in enumerate(old_keys):
+                if new_positions.get(row_key):
+                    row_map[i] = new_positions[row_key].pop()
+            self.apply_order(new_rows, row_map)
+            return sum([max(i2 - i1, j2 - j1) for tag, i1, i2, j1, j2 in opcodes if tag != 'equal'])
+        changed = 0
+        last_column = self.columnCount() - 1
+        # Apply opcodes back to front so earlier row numbers stay valid
+        for tag, i1, i2, j1, j2 in reversed(opcodes):
+            if tag == 'equal':
+                continue
+            common = min(i2 - i1, j2 - j1)
+            if common:
+                self.rows[i1:i1 + common] = new_rows[j1:j1 + common]
+                self.dataChanged.emit(self.index(i1, 0), self.index(i1 + common - 1, last_column))
+            if i2 - i1 > common:
+                self.beginRemoveRows(QModelIndex(), i1 + common, i2 - 1)
+                del self.rows[i1 + common:i2]
+                self.endRemoveRows()
+            if j2 - j1 > common:
+                self.beginInsertRows(QModelIndex(), i1 + common, i1 + (j2 - j1) - 1)
+                self.rows[i1 + common:i1 + common] = new_rows[j1 + common:j2]
+                self.endInsertRows()
+            changed += max(i2 - i1, j2 - j1)
+        self.set_rows(new_rows)  # Rows with equal keys may still carry new ids, art or dates
+        return changed
+
+# Define a delegate that paints the play buttons of the content view
+class PlayButtonDelegate(QStyledItemDelegate):
+    play_requested = pyqtSignal(int)  # Signal for the row whose play button was clicked
+
+    def paint(self, painter, option, index):
+        if not index.model().is_play_column(index.column()):
+            super().paint(painter, option, index)
+            return
+        painter.save()
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor("#333"))
+            painter.drawRoundedRect(option.rect.adjusted(2, 2, -2, -2), 5, 5)
+        font = painter.font()
+        font.setPixelSize(14)
+        painter.setFont(font)
+        painter.setPen(QColor("#1DB954"))
+        painter.drawText(option.rect, Qt.AlignmentFlag.AlignCenter, index.data())
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (model.is_play_column(index.column()) and event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton):
+            self.play_requested.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        if index.model().is_play_column(index.column()):
+            size.setWidth(40)
+        return size
+
 # Define the main application window
 class SpotifyMusicPlayer(QMainWindow):
     def __init__(self):
@@ -312,7 +2195,8 @@ class SpotifyMusicPlayer(QMainWindow):
             os.environ['VLC_PLUGIN_PATH'] = vlc_plugin_path
         self.initialize_vlc()
     auth_complete = pyqtSignal()
-    search_complete = pyqtSignal(list, int)  # Signal for search results and total fetched
+    search_page_loaded = pyqtSignal(int, int, list, int)  # Signal for a page of search results (generation, page, tracks, total)
+    search_failed = pyqtSignal(int, int, str)  # Signal for a failed or empty search page (generation, page, message)
     loading_started = pyqtSignal(str, str)  # Signal for loading state with title and image URL
 
     def __init__(self):
@@ -323,14 +2207,22 @@ class SpotifyMusicPlayer(QMainWindow):
         # Load caches at startup
         load_stream_cache()
         load_spotify_cache()
+        SEARCH_CACHE.load()
+        LOCAL_INDEX.submit(build_local_index)
+        YDL_POOL.warm()
         
         # Initialize core attributes
         self.sp = None
+        self.library_sync = None
         self.user_profile = None
+        self.playlist_index = {}  # Playlist ID -> playlist from the last load_playlists
+        self.album_art_loader = AlbumArtLoader(ALBUM_ART_CACHE_DIR, ALBUM_ART_MEMORY_BYTES, ALBUM_ART_DISK_BYTES, self)
+        self.album_art_url = ""  # Image URL the album art label is waiting for or showing
         self.initialize_vlc()  # Initialize VLC safely
         self.current_track = None
         self.track_queue = []
         self.loading_thread = None
+        self.loading_track = None  # Track the loading thread is resolving, skipped if it fails
         self.cancel_loading = False
         self.current_stream_url = None
         self.is_playing = False
@@ -338,9 +2230,13 @@ class SpotifyMusicPlayer(QMainWindow):
         self.current_track_index = -1
         self.queue_dialog = None
         self.current_playlist_tracks = []  # Store the current playlist tracks
-        self.search_thread = None  # For async search
+        self.search_generation = 0  # Bumped per search so results of superseded searches are dropped
+        self.search_quiet = False  # Search-as-you-type searches report problems without dialogs
+        self.search_showing_local = False  # Local matches are on screen, so a failed remote search is not reported
         self.current_search_query = ""  # To track the current search query
-        self.all_search_results = []  # Store all search results
+        self.search_pages = {}  # Page number -> result records for current_search_query
+        self.search_pages_requested = set()  # Pages of current_search_query being fetched
+        self.search_total = 0  # Total matches Spotify reported for current_search_query
         self.current_page = 1  # Track current page (1 to 10)
         self.max_pages = 10  # Maximum number of pages
         self.download_progress_dialog = None  # For download progress
@@ -350,10 +2246,20 @@ class SpotifyMusicPlayer(QMainWindow):
         self.is_shuffling = False  # Added for shuffle functionality
         self.current_library_selection = None  # Track current library selection
         self.current_playlist_selection = None  # Track current playlist selection
+        self.stream_retry_key = None  # Cache key of the track last re-resolved after a stream error
+        self.prefetcher = StreamPrefetcher()  # Resolves upcoming queue entries in the background
+        self.warm_worker = None  # Current playlist warming thread
+        self.warm_progress_dialog = None  # Progress dialog for playlist warming
+        self.load_generation = 0  # Tags LibraryLoader signals so superseded loads are ignored
+        self.library_loads = {}  # Target ("profile", "playlists", "content") -> (loader, on_page, on_finished)
+        self.library_loaders = []  # Loader threads kept alive until they finish
+        self.pending_warm_playlist = None  # Playlist to warm once its tracks have loaded
+        self.downloaded_files = []  # File names behind the rows of the Downloaded view
 
         # Set up event manager for VLC to detect end of media
         self.event_manager = self.vlc_player.event_manager()
         self.event_manager.event_attach(vlc.EventType.MediaPlayerEndReached, self.on_vlc_event)
+        self.event_manager.event_attach(vlc.EventType.MediaPlayerEncounteredError, self.on_vlc_event)
         
         # Create menu bar with authentication option
         menubar = self.menuBar()
@@ -361,6 +2267,14 @@ class SpotifyMusicPlayer(QMainWindow):
         self.auth_action = QAction("Login to Spotify", self)
         self.auth_action.triggered.connect(self.authenticate_spotify)
         auth_menu.addAction(self.auth_action)
+        search_menu = menubar.addMenu("Search")
+        self.search_as_you_type_action = QAction("Search as You Type", self)
+        self.search_as_you_type_action.setCheckable(True)
+        search_menu.addAction(self.search_as_you_type_action)
+        self.search_debounce = QTimer(self)
+        self.search_debounce.setSingleShot(True)
+        self.search_debounce.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_debounce.timeout.connect(self.search_as_you_type)
         
         # Set up the central widget and main layout
         central_widget = QWidget()
@@ -396,6 +2310,8 @@ class SpotifyMusicPlayer(QMainWindow):
         self.playlist_list = QListWidget()
         self.playlist_list.addItem("Loading playlists...")
         self.playlist_list.itemClicked.connect(self.on_playlist_item_clicked)
+        self.playlist_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.playlist_list.customContextMenuRequested.connect(self.show_playlist_context_menu)
         self.playlist_list.setMinimumHeight(400)
         self.playlist_list.setWordWrap(True)
         self.playlist_list.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
@@ -428,24 +2344,39 @@ class SpotifyMusicPlayer(QMainWindow):
         self.search_input.setFixedHeight(30)
         self.search_input.setMaxLength(32767)
         self.search_input.returnPressed.connect(self.start_search)
+        self.search_input.textEdited.connect(self.on_search_text_edited)
         self.search_input.setStyleSheet("""
             QLineEdit { border: 1px solid #333; border-radius: 15px; padding: 5px 10px; color: #ffffff; background-color: #2a2a2a; }
         """)
         
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter")
+        self.filter_input.setFixedHeight(30)
+        self.filter_input.setClearButtonEnabled(True)
+        self.filter_input.setStyleSheet(self.search_input.styleSheet())
+        
         user_layout.addWidget(self.user_label)
         user_layout.addStretch()
+        user_layout.addWidget(self.filter_input)
         user_layout.addWidget(self.search_input)
         
-        self.content_table = QTableWidget(0, 5)  # Added one column for play button
-        self.content_table.setHorizontalHeaderLabels(["Title", "Artist", "Album", "Duration", ""])
-        self.content_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.content_model = ContentTableModel(self)
+        self.content_table = QTableView()
+        self.content_table.setModel(self.content_model)
+        self.play_delegate = PlayButtonDelegate(self.content_table)  # Paints the play column instead of a button per row
+        self.play_delegate.play_requested.connect(self.on_play_requested)
+        self.content_table.setItemDelegate(self.play_delegate)
+        self.content_table.setMouseTracking(True)  # Hover highlight for the painted play buttons
         self.content_table.verticalHeader().setVisible(False)
         self.content_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.content_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)  # Enable multi-selection
-        self.content_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)  # Adjust play button column
+        self.content_model.modelReset.connect(self.apply_content_header)  # Resets drop per-section resize modes
+        self.apply_content_header()
+        self.content_table.setSortingEnabled(True)  # Header clicks sort through ContentTableModel.sort
+        self.filter_input.textChanged.connect(self.content_model.set_filter)
         self.content_table.setStyleSheet("""
-            QTableWidget { border: none; gridline-color: #333; color: #ffffff; background-color: #1a1a1a; }
-            QTableWidget::item { padding: 5px; color: #ffffff; }
+            QTableView { border: none; gridline-color: #333; color: #ffffff; background-color: #1a1a1a; }
+            QTableView::item { padding: 5px; color: #ffffff; }
             QHeaderView::section { background-color: #2a2a2a; border: none; padding: 5px; font-weight: bold; color: #ffffff; }
         """)
         self.content_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
@@ -493,7 +2424,7 @@ class SpotifyMusicPlayer(QMainWindow):
         control_layout = QHBoxLayout(control_bar)
         
         self.album_art = QLabel()
-        self.album_art.setFixedSize(80, 80)
+        self.album_art.setFixedSize(ALBUM_ART_SIZE, ALBUM_ART_SIZE)
         self.album_art.setStyleSheet("background-color: #333;")
         
         playback_controls = QWidget()
@@ -683,7 +2614,8 @@ class SpotifyMusicPlayer(QMainWindow):
         main_layout.addWidget(control_bar)
         
         self.auth_complete.connect(self.on_authentication_complete)
-        self.search_complete.connect(self.on_search_complete)  # Connect search signal
+        self.search_page_loaded.connect(self.on_search_page_loaded)  # Connect search signals
+        self.search_failed.connect(self.on_search_failed)
         self.loading_started.connect(self.on_loading_started)  # Connect loading signal
         self.check_saved_credentials()
         
@@ -706,65 +2638,25 @@ class SpotifyMusicPlayer(QMainWindow):
         self.vlc_instance = vlc.Instance('--no-video', '--network-caching=1000')
         self.vlc_player = self.vlc_instance.media_player_new()
 
-    def fetch_youtube_stream(self, title, artist):
-        cache_key = f"{title.lower()} - {artist.lower()}"
-        if cache_key in STREAM_CACHE:
-            print(f"Using cached stream URL for {title} - {artist}")
-            # Test the cached URL
-            try:
-                response = requests.head(STREAM_CACHE[cache_key]['url'], timeout=5)
-                if response.status_code == 403:
-                    print(f"Cached URL for {title} - {artist} returned 403, refreshing...")
-                    del STREAM_CACHE[cache_key]
-                    save_stream_cache()
-                else:
-                    return STREAM_CACHE[cache_key]['url']
-            except requests.RequestException as e:
-                print(f"Error checking cached URL for {title} - {artist}: {str(e)}")
-                del STREAM_CACHE[cache_key]
-                save_stream_cache()
-        
-        query = f"{title} {artist} official audio"
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'quiet': True,
-            'noplaylist': True,
-            'no_progress': True,
-        }
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            try:
-                if self.cancel_loading:
-                    return None
-                info = ydl.extract_info(f"ytsearch:{query}", download=False)
-                if self.cancel_loading:
-                    return None
-                stream_url = info['entries'][0]['url']
-                STREAM_CACHE[cache_key] = {
-                    'url': stream_url,
-                    'timestamp': datetime.now().isoformat()
-                }
-                save_stream_cache()
-                return stream_url
-            except Exception as e:
-                print(f"Error fetching YouTube stream: {str(e)}")
-                return None
-
     def load_track_async(self, track_info):
+        if self.stream_retry_key != stream_cache_key(track_info.title, track_info.artist):
+            self.stream_retry_key = None
         self.cancel_loading = True
         if self.loading_thread and self.loading_thread.is_alive():
             self.loading_thread.join(timeout=1)
         self.cancel_loading = False
         self.vlc_player.stop()
-        self.loading_started.emit(track_info["title"], track_info.get("image_url", ""))
+        self.loading_started.emit(track_info.title, track_info.image_url)
+        self.loading_track = track_info
         self.loading_thread = threading.Thread(target=self._load_track, args=(track_info,))
         self.loading_thread.daemon = True
         self.loading_thread.start()
 
     def _load_track(self, track_info):
-        title = track_info["title"]
-        artist = track_info["artist"]
-        image_url = track_info.get("image_url", "")
-        stream_url = self.fetch_youtube_stream(title, artist)
+        title = track_info.title
+        artist = track_info.artist
+        image_url = track_info.image_url
+        stream_url = RESOLVER.resolve(title, artist, lambda: self.cancel_loading)
         if stream_url and not self.cancel_loading:
             QMetaObject.invokeMethod(
                 self,
@@ -775,7 +2667,7 @@ class SpotifyMusicPlayer(QMainWindow):
                 Q_ARG(str, artist),
                 Q_ARG(str, image_url)
             )
-        else:
+        elif not self.cancel_loading:  # A cancelled load has already been replaced by the next one
             QMetaObject.invokeMethod(
                 self,
                 "loading_failed",
@@ -798,13 +2690,14 @@ class SpotifyMusicPlayer(QMainWindow):
             self.vlc_player.play()
         self.song_title.setText(title)
         self.artist_name.setText(artist)
-        self.current_track = {"title": title, "artist": artist, "image_url": image_url}
+        self.current_track = TrackRecord(title, artist, image_url=image_url)
         
         # Update queue dynamically based on current context
         self.update_queue_from_context()
         if self.current_track not in self.track_queue:
             self.track_queue.append(self.current_track)
         self.current_track_index = self.track_queue.index(self.current_track)
+        self.current_track = self.track_queue[self.current_track_index]
             
         self.load_thumbnail(image_url)
         self.set_volume(self.volume_slider.value())
@@ -813,6 +2706,7 @@ class SpotifyMusicPlayer(QMainWindow):
         self.duration_timer = QTimer()
         self.duration_timer.timeout.connect(self.update_duration)
         self.duration_timer.start(500)
+        self.schedule_prefetch()
         self.update_queue_display()
 
     @pyqtSlot(str, str)
@@ -821,52 +2715,46 @@ class SpotifyMusicPlayer(QMainWindow):
         self.artist_name.setText("")
         self.load_thumbnail(image_url)
 
+    @pyqtSlot()
     def loading_failed(self):
         self.song_title.setText("Loading Failed")
         self.artist_name.setText("")
-        self.album_art.setStyleSheet("background-color: #333;")
+        self.load_thumbnail("")
         self.is_playing = False
         self.play_button.setText("▶")
         self.track_position_slider.setValue(0)
         self.track_position_slider.setEnabled(False)
-        if self.track_queue:
+        if self.loading_track in self.track_queue:
+            # Drop the track that failed (it may not be at the stale index) and move on to the one after it
+            self.current_track_index = self.track_queue.index(self.loading_track)
             self.track_queue.pop(self.current_track_index)
             self.current_track_index = max(0, min(self.current_track_index, len(self.track_queue) - 1))
             if self.track_queue:
-                self.load_track_async(self.track_queue[self.current_track_index])
+                self.play_track_from_queue(self.track_queue[self.current_track_index])
             else:
                 self.reset_playback()
         self.update_queue_display()
 
     def load_thumbnail(self, url):
+        self.album_art_url = url
         if not url:
-            self.album_art.setStyleSheet("background-color: #333;")
+            self.show_thumbnail(url, None)
             return
-        try:
-            response = requests.get(url)
-            pixmap = QPixmap()
-            pixmap.loadFromData(response.content)
-            self.album_art.setPixmap(pixmap.scaled(80, 80, Qt.AspectRatioMode.KeepAspectRatio))
-        except Exception as e:
-            print(f"Error loading thumbnail: {str(e)}")
+        self.album_art_loader.request(url, lambda pixmap: self.show_thumbnail(url, pixmap))
+
+    def show_thumbnail(self, url, pixmap):
+        if url != self.album_art_url:
+            return  # Art of a track that is no longer current
+        if pixmap is None:
+            self.album_art.clear()
             self.album_art.setStyleSheet("background-color: #333;")
+            return
+        self.album_art.setPixmap(pixmap)
 
     def play_from_button(self, row):
-        title = self.content_table.item(row, 0).text()
-        artist = self.content_table.item(row, 1).text()
-        image_url = ""
-        if self.sp:
-            try:
-                results = self.sp.search(q=f"{title} {artist}", type="track", limit=1)
-                if results["tracks"]["items"]:
-                    image_url = results["tracks"]["items"][0]["album"]["images"][0]["url"]
-            except Exception as e:
-                print(f"Error fetching Spotify metadata: {str(e)}")
-
-        track_info = {"title": title, "artist": artist, "image_url": image_url}
-        
         # Update queue with all tracks from current context
         self.update_queue_from_context()
+        track_info = self.track_queue[row]
         self.current_track = track_info
         self.current_track_index = row  # Set index to the clicked row
         self.load_track_async(track_info)
@@ -874,16 +2762,15 @@ class SpotifyMusicPlayer(QMainWindow):
 
     def update_queue_from_context(self):
         """Dynamically update the queue based on the current table content."""
-        self.track_queue.clear()
-        for row in range(self.content_table.rowCount()):
-            title = self.content_table.item(row, 0).text()
-            artist = self.content_table.item(row, 1).text()
-            image_url = ""
-            if self.current_playlist_tracks and row < len(self.current_playlist_tracks):
-                track = self.current_playlist_tracks[row]["track"]
-                image_url = track["album"]["images"][0]["url"] if track["album"]["images"] else ""
-            track_info = {"title": title, "artist": artist, "image_url": image_url}
-            self.track_queue.append(track_info)
+        if self.current_playlist_tracks:
+            # Share the displayed records, in their sorted and filtered order, instead of copying them
+            self.track_queue = self.content_model.displayed_rows()
+            return
+        self.track_queue = []
+        for row in range(self.content_model.rowCount()):
+            title = self.content_model.text(row, 0)
+            artist = self.content_model.text(row, 1)
+            self.track_queue.append(TrackRecord(title, artist))
 
     def update_duration(self):
         duration = self.vlc_player.get_length()
@@ -980,9 +2867,8 @@ class SpotifyMusicPlayer(QMainWindow):
 
     def play_track_from_queue(self, track_info):
         """Play a track from the queue, handling both local and streamed tracks."""
-        title = track_info["title"]
-        artist = track_info["artist"]
-        image_url = track_info.get("image_url", "")
+        title = track_info.title
+        artist = track_info.artist
         
         # Check if the track is a downloaded file
         local_file = os.path.join(DOWNLOAD_FOLDER, f"{title} - {artist}.mp3")
@@ -996,7 +2882,7 @@ class SpotifyMusicPlayer(QMainWindow):
             self.song_title.setText(title)
             self.artist_name.setText(artist)
             self.current_track = track_info
-            self.album_art.setStyleSheet("background-color: #333;")
+            self.load_thumbnail("")
         else:
             self.load_track_async(track_info)  # Streamed track
         
@@ -1006,8 +2892,35 @@ class SpotifyMusicPlayer(QMainWindow):
         self.duration_timer = QTimer()
         self.duration_timer.timeout.connect(self.update_duration)
         self.duration_timer.start(500)
+        self.schedule_prefetch()
         self.update_queue_display()
 
+    def upcoming_tracks(self):
+        """Return the streamed tracks expected to play after the current one."""
+        if self.current_track_index < 0 or self.current_track_index >= len(self.track_queue):
+            return []
+        if self.is_looping:
+            # The current track repeats; keep its URL fresh for the next loop
+            upcoming = [self.track_queue[self.current_track_index]]
+        else:
+            # In shuffle mode the queue is reshuffled after each advance, so
+            # only the entry right after the current one is known to play next
+            count = 1 if self.is_shuffling else PREFETCH_AHEAD
+            start = self.current_track_index + 1
+            upcoming = self.track_queue[start:start + count]
+        return [
+            track for track in upcoming
+            if not os.path.exists(os.path.join(DOWNLOAD_FOLDER, f"{track.title} - {track.artist}.mp3"))
+            and not RESOLVER.known_failure(track.title, track.artist)
+        ]
+
+    def schedule_prefetch(self):
+        upcoming = self.upcoming_tracks()
+        self.prefetcher.schedule(upcoming)
+        for track in upcoming:
+            if track.image_url:
+                self.album_art_loader.request(track.image_url)  # Warm the art cache for the next tracks
+
     def shuffle_queue(self):
         """Shuffle the queue efficiently, preserving the current track."""
         if len(self.track_queue) <= 2:
@@ -1022,7 +2935,7 @@ class SpotifyMusicPlayer(QMainWindow):
         self.vlc_player.stop()
         self.song_title.setText("Not Playing")
         self.artist_name.setText("")
-        self.album_art.setStyleSheet("background-color: #333;")
+        self.load_thumbnail("")
         self.play_button.setText("▶")
         self.track_position_slider.setValue(0)
         self.track_position_slider.setEnabled(False)
@@ -1030,6 +2943,7 @@ class SpotifyMusicPlayer(QMainWindow):
         self.current_track_index = -1 if not self.track_queue else 0
         self.is_local_track = False
         self.current_stream_url = None
+        self.prefetcher.cancel()
         self.update_queue_display()
 
     def show_queue_dialog(self):
@@ -1041,9 +2955,28 @@ class SpotifyMusicPlayer(QMainWindow):
     def on_vlc_event(self, event):
         if event.type == vlc.EventType.MediaPlayerEndReached:
             QMetaObject.invokeMethod(self, "on_song_ended", Qt.ConnectionType.QueuedConnection)
+        elif event.type == vlc.EventType.MediaPlayerEncounteredError:
+            QMetaObject.invokeMethod(self, "on_stream_error", Qt.ConnectionType.QueuedConnection)
+
+    @pyqtSlot()
+    def on_stream_error(self):
+        """Re-resolve a stream the server rejected (usually an expired or 403 URL) once, then give up."""
+        if self.is_local_track or not self.current_track:
+            return
+        cache_key = stream_cache_key(self.current_track.title, self.current_track.artist)
+        STREAM_CACHE.delete(cache_key)
+        if self.stream_retry_key == cache_key:
+            print(f"Stream for {self.current_track.title} failed again after refreshing")
+            self.stream_retry_key = None
+            self.loading_failed()
+            return
+        print(f"Stream for {self.current_track.title} was rejected, refreshing...")
+        self.stream_retry_key = cache_key
+        self.load_track_async(self.current_track)
 
     @pyqtSlot()
     def on_song_ended(self):
+        self.stream_retry_key = None
         try:
             if self.is_looping and self.current_track_index >= 0 and self.track_queue:
                 self.play_track_from_queue(self.track_queue[self.current_track_index])
@@ -1064,6 +2997,7 @@ class SpotifyMusicPlayer(QMainWindow):
 
     def toggle_loop(self):
         self.is_looping = self.loop_button.isChecked()
+        self.schedule_prefetch()
         print(f"Looping: {self.is_looping}")
 
     def toggle_shuffle(self):
@@ -1071,20 +3005,15 @@ class SpotifyMusicPlayer(QMainWindow):
         if self.is_shuffling and len(self.track_queue) > 1:
             self.shuffle_queue()
             self.update_queue_display()
+        self.schedule_prefetch()
         print(f"Shuffling: {self.is_shuffling}")
 
     def play_local_track(self, row, file_path):
-        title = self.content_table.item(row, 0).text()
-        artist = self.content_table.item(row, 1).text()
-        
-        track_info = {
-            "title": title,
-            "artist": artist,
-            "image_url": ""  # No image available for local files
-        }
-        
         # Update queue with all downloaded tracks
         self.update_queue_from_context()
+        track_info = self.track_queue[row]  # No image available for local files
+        title = track_info.title
+        artist = track_info.artist
         self.current_track = track_info
         self.current_track_index = row  # Set index to the clicked row
         
@@ -1098,7 +3027,7 @@ class SpotifyMusicPlayer(QMainWindow):
         self.song_title.setText(title)
         self.artist_name.setText(artist)
         self.current_track = track_info
-        self.album_art.setStyleSheet("background-color: #333;")  # No album art for local files
+        self.load_thumbnail("")  # No album art for local files
         self.set_volume(self.volume_slider.value())
         self.play_button.setText("⏸")
         self.is_playing = True
@@ -1106,6 +3035,7 @@ class SpotifyMusicPlayer(QMainWindow):
         self.duration_timer = QTimer()
         self.duration_timer.timeout.connect(self.update_duration)
         self.duration_timer.start(500)
+        self.schedule_prefetch()
         self.update_queue_display()
 
     def on_library_item_clicked(self, item):
@@ -1115,6 +3045,8 @@ class SpotifyMusicPlayer(QMainWindow):
         self.current_library_selection = item.text()
         self.current_playlist_selection = None
         self.page_widget.setVisible(False)  # Hide pagination buttons for library views
+        self.cancel_library_load("content")
+        self.cancel_search()
         text = item.text()
         if text == "Liked Music":
             self.load_liked_music()
@@ -1129,27 +3061,36 @@ class SpotifyMusicPlayer(QMainWindow):
         if not self.sp:
             return
         self.library_list.clearSelection()  # Clear library selection
-        self.current_playlist_selection = item.text()
+        playlist_id = item.data(Qt.ItemDataRole.UserRole)
+        if not playlist_id:  # Placeholder rows such as "Loading playlists..."
+            return
+        self.current_playlist_selection = playlist_id
         self.current_library_selection = None
         self.page_widget.setVisible(False)  # Hide pagination buttons for playlist views
-        playlist_name = item.text()
-        self.load_playlist_tracks(playlist_name)
+        self.cancel_library_load("content")
+        self.cancel_search()
+        self.load_playlist_tracks(playlist_id)
     
     def authenticate_spotify(self):
         if self.sp:
+            for target in list(self.library_loads):
+                self.cancel_library_load(target)
             self.sp = None
+            self.library_sync = None
             self.user_profile = None
+            self.playlist_index = {}
             self.auth_action.setText("Login to Spotify")
             self.user_label.setText("Not logged in")
             self.playlist_list.clear()
             self.playlist_list.addItem("Login to view playlists")
-            self.content_table.setRowCount(0)
+            self.content_model.reset([])
             self.page_widget.setVisible(False)  # Hide pagination buttons on logout
             if os.path.exists("spotify_credentials.json"):
                 os.remove("spotify_credentials.json")
-            global SPOTIFY_CACHE
-            SPOTIFY_CACHE = {}
-            save_spotify_cache()
+            SPOTIFY_CACHE.clear()
+            SEARCH_CACHE.clear()
+            # Keep only the download folder searchable; the rest belonged to the account
+            LOCAL_INDEX.submit(LOCAL_INDEX.retain, {LOCAL_SEARCH_DOWNLOADS})
             return
         
         auth_dialog = SpotifyAuthDialog(self)
@@ -1157,377 +3098,437 @@ class SpotifyMusicPlayer(QMainWindow):
             credentials = auth_dialog.get_credentials()
             try:
                 scope = "user-library-read playlist-read-private user-top-read playlist-read-collaborative"
-                self.sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-                    client_id=credentials["client_id"],
-                    client_secret=credentials["client_secret"],
-                    redirect_uri=credentials["redirect_uri"],
-                    scope=scope,
-                    open_browser=True
-                ))
+                self.sp = self.create_spotify_client(credentials, scope)
                 with open("spotify_credentials.json", "w") as f:
                     json.dump(credentials, f)
+                self.library_sync = LibrarySync(self.sp)
                 self.auth_complete.emit()
             except Exception as e:
                 QMessageBox.critical(self, "Authentication Error", f"Failed to authenticate: {str(e)}")
     
+    def create_spotify_client(self, credentials, scope):
+        # Route spotipy through the shared HTTP layer so API calls reuse pooled connections
+        return spotipy.Spotify(
+            auth_manager=SpotifyOAuth(
+                client_id=credentials["client_id"],
+                client_secret=credentials["client_secret"],
+                redirect_uri=credentials["redirect_uri"],
+                scope=scope,
+                open_browser=True,
+                requests_session=HTTP.session(SPOTIFY_ACCOUNTS_HOST),
+                requests_timeout=HTTP_TIMEOUT
+            ),
+            requests_session=HTTP.session(SPOTIFY_API_HOST),
+            requests_timeout=HTTP_TIMEOUT
+        )
+
     def check_saved_credentials(self):
         if os.path.exists("spotify_credentials.json"):
             try:
                 with open("spotify_credentials.json", "r") as f:
                     credentials = json.load(f)
                 scope = "user-library-read playlist-read-private user-top-read playlist-read-collaborative"
-                self.sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-                    client_id=credentials["client_id"],
-                    client_secret=credentials["client_secret"],
-                    redirect_uri=credentials["redirect_uri"],
-                    scope=scope,
-                    open_browser=True
-                ))
+                self.sp = self.create_spotify_client(credentials, scope)
+                self.library_sync = LibrarySync(self.sp)
                 self.auth_complete.emit()
             except Exception as e:
                 print(f"Error loading saved credentials: {str(e)}")
     
     def on_authentication_complete(self):
         self.auth_action.setText("Logout from Spotify")
-        try:
-            self.user_profile = self.sp.current_user()
-            self.user_label.setText(f"Logged in as: {self.user_profile['display_name']}")
-            self.load_playlists()
-            self.load_liked_music()
-        except Exception as e:
-            QMessageBox.warning(self, "API Error", f"Error retrieving Spotify data: {str(e)}")
-    
+        sp = self.sp
+        self.start_library_load(
+            "profile",
+            lambda on_page, is_cancelled: call_spotify(sp.current_user, is_cancelled=is_cancelled),
+            None,
+            self.on_profile_loaded
+        )
+
+    def on_profile_loaded(self, profile, error):
+        if error:
+            QMessageBox.warning(self, "API Error", f"Error retrieving Spotify data: {error}")
+            return
+        self.user_profile = profile
+        self.user_label.setText(f"Logged in as: {self.user_profile['display_name']}")
+        self.load_playlists()
+        self.load_liked_music()
+
+    def start_library_load(self, target, fetch, on_page, on_finished):
+        """Run fetch on a LibraryLoader, replacing whatever was loading into target.
+
+        on_page and on_finished(result, error) are called on the GUI thread,
+        and only while this load is still the current one for target.
+        """
+        self.cancel_library_load(target)
+        self.library_loaders = [loader for loader in self.library_loaders if not loader.isFinished()]
+        self.load_generation += 1
+        loader = LibraryLoader(self.load_generation, fetch)
+        loader.page_loaded.connect(self.on_library_page)
+        loader.load_finished.connect(self.on_library_loaded)
+        self.library_loads[target] = (loader, on_page, on_finished)
+        self.library_loaders.append(loader)
+        loader.start()
+
+    def cancel_library_load(self, target):
+        if target == "content":
+            self.pending_warm_playlist = None
+        entry = self.library_loads.pop(target, None)
+        if entry:
+            entry[0].cancel()
+
+    def find_library_load(self, generation):
+        for target, entry in self.library_loads.items():
+            if entry[0].generation == generation:
+                return target, entry
+        return None, None
+
+    @pyqtSlot(int, object)
+    def on_library_page(self, generation, items):
+        target, entry = self.find_library_load(generation)
+        if entry and entry[1]:
+            entry[1](items)
+
+    @pyqtSlot(int, object, str)
+    def on_library_loaded(self, generation, result, error):
+        target, entry = self.find_library_load(generation)
+        if not entry:
+            return  # Superseded by a newer load or cancelled
+        del self.library_loads[target]
+        entry[2](result, error)
+
     def load_playlists(self):
         if not self.sp:
             return
         cache_key = f"playlists_{self.user_profile['id']}"
-        if cache_key in SPOTIFY_CACHE:
+        cached = SPOTIFY_CACHE.get(cache_key)
+        self.playlist_index = {}
+        self.playlist_list.clear()
+        if cached:
             print(f"Loading playlists from cache for user {self.user_profile['id']}")
-            playlists = SPOTIFY_CACHE[cache_key]['data']
-            self.playlist_list.clear()
-            for playlist in playlists:
-                self.playlist_list.addItem(playlist["name"])
-            return
+            self.add_playlist_items(cached['data'])
+            if not ShardedCache.is_stale(cached):
+                return
+            add_page = None  # Revalidate quietly, on_playlists_loaded applies any changes
+        else:
+            self.playlist_list.addItem("Loading playlists...")
+            add_page = self.add_playlist_items
+        library_sync = self.library_sync
+        self.start_library_load(
+            "playlists",
+            lambda on_page, is_cancelled: library_sync.fetch_playlists(on_page, is_cancelled),
+            add_page,
+            self.on_playlists_loaded
+        )
 
-        try:
+    def add_playlist_items(self, playlists):
+        if self.playlist_list.count() and not self.playlist_list.item(0).data(Qt.ItemDataRole.UserRole):
+            self.playlist_list.clear()  # Drop the placeholder row
+        for playlist in playlists:
+            self.playlist_index[playlist["id"]] = playlist
+            item = QListWidgetItem(playlist["name"])
+            item.setData(Qt.ItemDataRole.UserRole, playlist["id"])
+            self.playlist_list.addItem(item)
+
+    def on_playlists_loaded(self, all_playlists, error):
+        if error:
+            print(f"Error loading playlists: {error}")
+            if not self.playlist_index:
+                self.playlist_list.clear()  # Drop the placeholder row
+            return
+        shown = [(self.playlist_list.item(i).data(Qt.ItemDataRole.UserRole), self.playlist_list.item(i).text())
+                 for i in range(self.playlist_list.count())]
+        if shown != [(playlist["id"], playlist["name"]) for playlist in all_playlists]:
             self.playlist_list.clear()
-            offset = 0
-            limit = 50
-            all_playlists = []
-            while True:
-                playlists = self.sp.current_user_playlists(limit=limit, offset=offset)
-                all_playlists.extend(playlists["items"])
-                for playlist in playlists["items"]:
-                    self.playlist_list.addItem(playlist["name"])
-                if len(playlists["items"]) < limit:
-                    break
-                offset += limit
-            SPOTIFY_CACHE[cache_key] = {
-                'data': all_playlists,
-                'timestamp': datetime.now().isoformat()
-            }
-            save_spotify_cache()
-        except Exception as e:
-            print(f"Error loading playlists: {str(e)}")
+            self.add_playlist_items(all_playlists)
+            for i in range(self.playlist_list.count()):
+                if self.playlist_list.item(i).data(Qt.ItemDataRole.UserRole) == self.current_playlist_selection:
+                    self.playlist_list.setCurrentRow(i)
+        old_index = self.playlist_index
+        self.playlist_index = {playlist["id"]: playlist for playlist in all_playlists}
+        SPOTIFY_CACHE[f"playlists_{self.user_profile['id']}"] = {
+            'data': all_playlists,
+            'timestamp': datetime.now().isoformat()
+        }
+        self.prune_playlist_caches(all_playlists)
+        # Revalidate the open playlist if the refreshed listing reports a new snapshot
+        selected = self.current_playlist_selection
+        if (selected in self.playlist_index and selected in old_index and "content" not in self.library_loads
+                and self.playlist_index[selected].get("snapshot_id") != old_index[selected].get("snapshot_id")):
+            self.load_playlist_tracks(selected)
+
+    def prune_playlist_caches(self, playlists):
+        """Drop cached tracks of playlists that no longer appear in the listing."""
+        prefix = f"playlist_{self.user_profile['id']}_"
+        playlist_ids = {playlist["id"] for playlist in playlists}
+        for cache_key in SPOTIFY_CACHE:
+            if cache_key.startswith(prefix) and cache_key[len(prefix):] not in playlist_ids:
+                del SPOTIFY_CACHE[cache_key]
+                LOCAL_INDEX.submit(LOCAL_INDEX.remove_source, cache_key)
     
     def load_liked_music(self):
         if not self.sp:
             return
         cache_key = f"liked_music_{self.user_profile['id']}"
-        if cache_key in SPOTIFY_CACHE:
+        cached = SPOTIFY_CACHE.get(cache_key)
+        cached_tracks = records_from_rows(cached['data']) if cached else []
+        if cached:
             print(f"Loading liked music from cache for user {self.user_profile['id']}")
-            tracks = SPOTIFY_CACHE[cache_key]['data']
-            self.current_playlist_tracks = tracks
-            self.display_tracks(tracks, self.content_table)
+        library_sync = self.library_sync
+        self.load_track_view(
+            lambda on_page, is_cancelled: library_sync.sync_liked_tracks(cached_tracks, on_page, is_cancelled),
+            lambda result, error: self.on_liked_music_loaded(cache_key, result, error),
+            cached_tracks if cached else None,
+            revalidate=not cached or ShardedCache.is_stale(cached)
+        )
+
+    def on_liked_music_loaded(self, cache_key, result, error):
+        if error:
+            print(f"Error loading liked music: {error}")
+            return
+        tracks, changed = result
+        if not changed:
+            print(f"Liked music for user {self.user_profile['id']} is up to date")
+        SPOTIFY_CACHE[cache_key] = {
+            'data': [track.to_row() for track in tracks],
+            'timestamp': datetime.now().isoformat(),
+            'synced': True
+        }
+        if changed:
+            LOCAL_INDEX.submit(LOCAL_INDEX.index_source, cache_key, tracks)
+        self.finish_track_view(tracks)
+
+    def load_track_view(self, fetch, on_finished, cached_tracks=None, revalidate=True):
+        """Show a track view stale-while-revalidate.
+
+        Cached tracks render at once and, if revalidate is set, fetch runs in
+        the background and finish_track_view patches in whatever changed.
+        Without a cache the table fills page by page as fetch delivers records.
+        """
+        if cached_tracks is None:
+            self.current_playlist_tracks = []
+            self.display_tracks([])
+            self.start_library_load("content", fetch, self.append_loaded_tracks, on_finished)
             return
+        self.current_playlist_tracks = cached_tracks
+        self.display_tracks(cached_tracks)
+        if revalidate:
+            self.start_library_load("content", fetch, None, on_finished)
+
+    def append_loaded_tracks(self, tracks):
+        self.current_playlist_tracks.extend(tracks)
+        self.content_model.append(tracks)
+
+    def finish_track_view(self, tracks):
+        changed = self.content_model.update_rows(tracks, TrackRecord.display_key)
+        if changed:
+            print(f"Updated {changed} rows from the refreshed view")
+        self.current_playlist_tracks = tracks
 
-        try:
-            tracks = []
-            offset = 0
-            limit = 50
-            while True:
-                results = self.sp.current_user_saved_tracks(limit=limit, offset=offset)
-                tracks.extend(results["items"])
-                if len(results["items"]) < limit:
-                    break
-                offset += limit
-            self.current_playlist_tracks = tracks
-            self.display_tracks(tracks, self.content_table)
-            SPOTIFY_CACHE[cache_key] = {
-                'data': tracks,
-                'timestamp': datetime.now().isoformat()
-            }
-            save_spotify_cache()
-        except Exception as e:
-            print(f"Error loading liked music: {str(e)}")
-    
     def load_top_artists(self):
         if not self.sp:
             return
-        cache_key = f"top_artists_{self.user_profile['id']}"
-        if cache_key in SPOTIFY_CACHE:
-            print(f"Loading top artists from cache for user {self.user_profile['id']}")
-            artists = SPOTIFY_CACHE[cache_key]['data']
-            self.content_table.setHorizontalHeaderLabels(["Artist", "Genres", "Popularity", ""])
-            self.content_table.setColumnCount(4)
-            self.content_table.setRowCount(0)
-            for i, artist in enumerate(artists):
-                self.content_table.insertRow(i)
-                self.content_table.setItem(i, 0, QTableWidgetItem(artist["name"]))
-                self.content_table.setItem(i, 1, QTableWidgetItem(", ".join(artist["genres"][:3])))
-                self.content_table.setItem(i, 2, QTableWidgetItem(str(artist["popularity"])))
-            self.current_playlist_tracks = []
-            return
+        sp = self.sp
+        self.load_row_view(
+            f"top_artists_{self.user_profile['id']}", "top artists", ARTIST_COLUMNS,
+            lambda on_page, is_cancelled: fetch_all_pages(
+                sp.current_user_top_artists, limit=20, on_page=on_page, is_cancelled=is_cancelled
+            ),
+            lambda artist: (artist["name"], tuple(artist["genres"][:3]), artist["popularity"])
+        )
 
-        try:
-            artists = []
-            offset = 0
-            limit = 20
-            while True:
-                results = self.sp.current_user_top_artists(limit=limit, offset=offset)
-                artists.extend(results["items"])
-                if len(results["items"]) < limit:
-                    break
-                offset += limit
-            self.content_table.setHorizontalHeaderLabels(["Artist", "Genres", "Popularity", ""])
-            self.content_table.setColumnCount(4)
-            self.content_table.setRowCount(0)
-            for i, artist in enumerate(artists):
-                self.content_table.insertRow(i)
-                self.content_table.setItem(i, 0, QTableWidgetItem(artist["name"]))
-                self.content_table.setItem(i, 1, QTableWidgetItem(", ".join(artist["genres"][:3])))
-                self.content_table.setItem(i, 2, QTableWidgetItem(str(artist["popularity"])))
-            self.current_playlist_tracks = []
-            SPOTIFY_CACHE[cache_key] = {
-                'data': artists,
-                'timestamp': datetime.now().isoformat()
-            }
-            save_spotify_cache()
-        except Exception as e:
-            print(f"Error loading top artists: {str(e)}")
+    def load_row_view(self, cache_key, label, columns, fetch, key):
+        """Show an artist or album view stale-while-revalidate, like load_track_view."""
+        cached = SPOTIFY_CACHE.get(cache_key)
+        self.current_playlist_tracks = []
+        self.content_model.reset([], columns, playable=False)
+        on_finished = lambda rows, error: self.on_row_view_loaded(cache_key, label, key, rows, error)
+        if not cached:
+            self.start_library_load("content", fetch, self.content_model.append, on_finished)
+            return
+        print(f"Loading {label} from cache for user {self.user_profile['id']}")
+        self.content_model.append(cached['data'])
+        if ShardedCache.is_stale(cached):
+            self.start_library_load("content", fetch, None, on_finished)
+
+    def on_row_view_loaded(self, cache_key, label, key, rows, error):
+        if error:
+            print(f"Error loading {label}: {error}")
+            return
+        changed = self.content_model.update_rows(rows, key)
+        if changed:
+            print(f"Updated {changed} rows from the refreshed view")
+        SPOTIFY_CACHE[cache_key] = {
+            'data': rows,
+            'timestamp': datetime.now().isoformat()
+        }
     
     def load_top_albums(self):
         if not self.sp:
             return
-        cache_key = f"top_albums_{self.user_profile['id']}"
-        if cache_key in SPOTIFY_CACHE:
-            print(f"Loading top albums from cache for user {self.user_profile['id']}")
-            albums = SPOTIFY_CACHE[cache_key]['data']
-            self.content_table.setHorizontalHeaderLabels(["Album", "Artist", "Release Date", "Tracks"])
-            self.content_table.setColumnCount(4)
-            self.content_table.setRowCount(0)
-            for i, item in enumerate(albums):
-                album = item["album"]
-                self.content_table.insertRow(i)
-                self.content_table.setItem(i, 0, QTableWidgetItem(album["name"]))
-                self.content_table.setItem(i, 1, QTableWidgetItem(", ".join([artist["name"] for artist in album["artists"]])))
-                self.content_table.setItem(i, 2, QTableWidgetItem(album["release_date"]))
-                self.content_table.setItem(i, 3, QTableWidgetItem(str(album["total_tracks"])))
-            self.current_playlist_tracks = []
-            return
-
-        try:
-            albums = []
-            offset = 0
-            limit = 20
-            while True:
-                results = self.sp.current_user_saved_albums(limit=limit, offset=offset)
-                albums.extend(results["items"])
-                if len(results["items"]) < limit:
-                    break
-                offset += limit
-            self.content_table.setHorizontalHeaderLabels(["Album", "Artist", "Release Date", "Tracks"])
-            self.content_table.setColumnCount(4)
-            self.content_table.setRowCount(0)
-            for i, item in enumerate(albums):
-                album = item["album"]
-                self.content_table.insertRow(i)
-                self.content_table.setItem(i, 0, QTableWidgetItem(album["name"]))
-                self.content_table.setItem(i, 1, QTableWidgetItem(", ".join([artist["name"] for artist in album["artists"]])))
-                self.content_table.setItem(i, 2, QTableWidgetItem(album["release_date"]))
-                self.content_table.setItem(i, 3, QTableWidgetItem(str(album["total_tracks"])))
-            self.current_playlist_tracks = []
-            SPOTIFY_CACHE[cache_key] = {
-                'data': albums,
-                'timestamp': datetime.now().isoformat()
-            }
-            save_spotify_cache()
-        except Exception as e:
-            print(f"Error loading albums: {str(e)}")
+        sp = self.sp
+        self.load_row_view(
+            f"top_albums_{self.user_profile['id']}", "top albums", ALBUM_COLUMNS,
+            lambda on_page, is_cancelled: fetch_all_pages(
+                lambda limit, offset: sp.current_user_saved_albums(limit=limit, offset=offset, market=SPOTIFY_MARKET),
+                limit=20, on_page=on_page, is_cancelled=is_cancelled
+            ),
+            lambda item: (item["album"]["name"], tuple(artist["name"] for artist in item["album"]["artists"]),
+                          item["album"]["release_date"], item["album"]["total_tracks"])
+        )
     
-    def load_playlist_tracks(self, playlist_name):
+    def load_playlist_tracks(self, playlist_id):
         if not self.sp:
             return
-        cache_key = f"playlist_{self.user_profile['id']}_{playlist_name}"
-        if cache_key in SPOTIFY_CACHE:
-            print(f"Loading playlist tracks from cache: {playlist_name}")
-            tracks = SPOTIFY_CACHE[cache_key]['data']
-            self.current_playlist_tracks = tracks
-            self.display_tracks(tracks, self.content_table)
-            return
+        cache_key = f"playlist_{self.user_profile['id']}_{playlist_id}"
+        cached = SPOTIFY_CACHE.get(cache_key)
+        playlist = self.playlist_index.get(playlist_id)
+
+        # A cached playlist always renders at once; it is only refetched when its snapshot moved on
+        current = LibrarySync.playlist_is_current(cached, playlist)
+        if cached:
+            print(f"Loading playlist tracks from cache: {playlist['name'] if playlist else playlist_id}")
+        library_sync = self.library_sync
+        self.load_track_view(
+            lambda on_page, is_cancelled: library_sync.fetch_playlist_tracks(playlist_id, on_page, is_cancelled),
+            lambda tracks, error: self.on_playlist_tracks_loaded(playlist_id, cache_key, playlist, tracks, error),
+            records_from_rows(cached['data']) if cached else None,
+            revalidate=not current
+        )
+        if current:
+            self.on_playlist_tracks_shown(playlist_id)
 
-        try:
-            offset = 0
-            limit = 50
-            playlist_id = None
-            while True:
-                playlists = self.sp.current_user_playlists(limit=limit, offset=offset)
-                for playlist in playlists["items"]:
-                    if playlist["name"] == playlist_name:
-                        playlist_id = playlist["id"]
-                        break
-                if playlist_id or len(playlists["items"]) < limit:
-                    break
-                offset += limit
-            
-            if not playlist_id:
-                return
-                
-            tracks = []
-            offset = 0
-            limit = 100
-            while True:
-                results = self.sp.playlist_tracks(playlist_id, limit=limit, offset=offset)
-                tracks.extend(results["items"])
-                if len(results["items"]) < limit:
-                    break
-                offset += limit
-            self.current_playlist_tracks = tracks
-            self.display_tracks(tracks, self.content_table)
+    def on_playlist_tracks_loaded(self, playlist_id, cache_key, playlist, tracks, error):
+        if error:
+            print(f"Error loading playlist tracks: {error}")
+        else:
             SPOTIFY_CACHE[cache_key] = {
-                'data': tracks,
-                'timestamp': datetime.now().isoformat()
+                'data': [track.to_row() for track in tracks],
+                'timestamp': datetime.now().isoformat(),
+                'snapshot_id': playlist.get("snapshot_id") if playlist else None,
+                'synced': bool(playlist)
             }
-            save_spotify_cache()
-        except Exception as e:
-            print(f"Error loading playlist tracks: {str(e)}")
+            LOCAL_INDEX.submit(LOCAL_INDEX.index_source, cache_key, tracks)
+            self.finish_track_view(tracks)
+        self.on_playlist_tracks_shown(playlist_id)
+
+    def on_playlist_tracks_shown(self, playlist_id):
+        if self.pending_warm_playlist == playlist_id:
+            self.pending_warm_playlist = None
+            self.warm_current_tracks()
 
     def load_downloaded_tracks(self):
-        self.content_table.setHorizontalHeaderLabels(["Title", "Artist", "Album", "Duration", ""])
-        self.content_table.setColumnCount(5)
-        self.content_table.setRowCount(0)
-        
         if not os.path.exists(DOWNLOAD_FOLDER):
-            self.content_table.insertRow(0)
-            self.content_table.setItem(0, 0, QTableWidgetItem("No downloaded tracks found"))
-            self.content_table.setItem(0, 1, QTableWidgetItem(""))
-            self.content_table.setItem(0, 2, QTableWidgetItem(""))
-            self.content_table.setItem(0, 3, QTableWidgetItem(""))
+            self.content_model.show_message("No downloaded tracks found")
             return
 
-        downloaded_files = [f for f in os.listdir(DOWNLOAD_FOLDER) if f.endswith('.mp3')]
-        self.current_playlist_tracks = []  # Clear current playlist tracks since these are local files
-        
-        for i, filename in enumerate(downloaded_files):
-            try:
-                name_without_ext = os.path.splitext(filename)[0]
-                if " - " in name_without_ext:
-                    title, artist = name_without_ext.split(" - ", 1)
-                else:
-                    title = name_without_ext
-                    artist = "Unknown"
-            except Exception:
-                title = filename
-                artist = "Unknown"
-
-            self.content_table.insertRow(i)
-            self.content_table.setItem(i, 0, QTableWidgetItem(title))
-            self.content_table.setItem(i, 1, QTableWidgetItem(artist))
-            self.content_table.setItem(i, 2, QTableWidgetItem("Downloaded"))
-            self.content_table.setItem(i, 3, QTableWidgetItem("N/A"))
-            
-            play_button = QPushButton("▶")
-            play_button.setStyleSheet("""
-                QPushButton { background-color: transparent; border: none; font-size: 14px; color: #1DB954; }
-                QPushButton:hover { background-color: #333; border-radius: 5px; }
-            """)
-            full_path = os.path.join(DOWNLOAD_FOLDER, filename)
-            play_button.clicked.connect(lambda checked, row=i, path=full_path: self.play_local_track(row, path))
-            self.content_table.setCellWidget(i, 4, play_button)
-
-    def display_tracks(self, tracks, table):
-        table.setHorizontalHeaderLabels(["Title", "Artist", "Album", "Duration", ""])
-        table.setColumnCount(5)
-        table.setRowCount(0)
-        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        for i, item in enumerate(tracks):
-            track = item["track"] if "track" in item else item
-            if track:
-                table.insertRow(i)
-                table.setItem(i, 0, QTableWidgetItem(track["name"]))
-                table.setItem(i, 1, QTableWidgetItem(", ".join([artist["name"] for artist in track["artists"]])))
-                table.setItem(i, 2, QTableWidgetItem(track["album"]["name"]))
-                duration_ms = track["duration_ms"]
-                minutes = duration_ms // 60000
-                seconds = (duration_ms % 60000) // 1000
-                table.setItem(i, 3, QTableWidgetItem(f"{minutes}:{seconds:02d}"))
-                play_button = QPushButton("▶")
-                play_button.setStyleSheet("""
-                    QPushButton { background-color: transparent; border: none; font-size: 14px; color: #1DB954; }
-                    QPushButton:hover { background-color: #333; border-radius: 5px; }
-                """)
-                play_button.clicked.connect(lambda checked, row=i: self.play_from_button(row))
-                table.setCellWidget(i, 4, play_button)
-
-    def start_search(self):
+        downloaded = downloaded_tracks()
+        self.downloaded_files = [filename for filename, _ in downloaded]
+        self.current_playlist_tracks = [track for _, track in downloaded]
+        LOCAL_INDEX.submit(LOCAL_INDEX.index_source, LOCAL_SEARCH_DOWNLOADS, list(self.current_playlist_tracks))
+        self.content_model.reset(self.current_playlist_tracks)
+
+    def display_tracks(self, tracks):
+        self.content_model.reset(tracks)
+
+    def apply_content_header(self):
+        header = self.content_table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        if self.content_model.playable:
+            # Adjust play button column
+            header.setSectionResizeMode(len(self.content_model.columns), QHeaderView.ResizeMode.ResizeToContents)
+        # Views with other columns start unsorted
+        sort_column = self.content_model.sort_column
+        order = Qt.SortOrder.DescendingOrder if self.content_model.descending else Qt.SortOrder.AscendingOrder
+        header.setSortIndicator(-1 if sort_column is None else sort_column, order)
+
+    def on_play_requested(self, row):
+        if self.current_library_selection == "Downloaded":
+            filename = self.downloaded_files[self.content_model.source_row(row)]
+            self.play_local_track(row, os.path.join(DOWNLOAD_FOLDER, filename))
+        else:
+            self.play_from_button(row)
+
+    def on_search_text_edited(self, text):
+        if self.search_as_you_type_action.isChecked():
+            self.search_debounce.start()  # Restarts the countdown on every keystroke
+
+    def search_as_you_type(self):
+        query = self.search_input.text().strip()
+        if self.sp and len(query) >= SEARCH_AS_YOU_TYPE_MIN_CHARS and query != self.current_search_query:
+            self.start_search(quiet=True)
+
+    def start_search(self, quiet=False):
+        self.search_debounce.stop()
         query = self.search_input.text().strip()
         if not query:
             QMessageBox.warning(self, "Search Error", "Please enter a search query.")
             return
+        self.search_generation += 1
+        self.search_quiet = quiet
         self.current_search_query = query
         self.current_page = 1
-        self.all_search_results = []
+        self.search_pages = {}
+        self.search_pages_requested = set()
+        self.search_total = 0
+        for i, button in enumerate(self.page_buttons, 1):
+            button.setChecked(i == self.current_page)
         self.library_list.clearSelection()  # Clear sidebar selections
         self.playlist_list.clearSelection()
         self.current_library_selection = None
         self.current_playlist_selection = None
-        if self.search_thread and self.search_thread.is_alive():
-            self.search_thread.join(timeout=1)
-        self.search_thread = threading.Thread(target=self._perform_search, args=(query, 0))
-        self.search_thread.daemon = True
-        self.search_thread.start()
-
-    def _perform_search(self, query, offset):
+        self.cancel_library_load("content")
+        # Tracks already known locally show at once, remote results replace them when they arrive
+        started = time.monotonic()
+        local_tracks = LOCAL_INDEX.search(query)
+        self.search_showing_local = bool(local_tracks)
+        if local_tracks:
+            print(f"Local search matched {len(local_tracks)} tracks in {1000 * (time.monotonic() - started):.2f} ms")
+            self.page_widget.setVisible(False)
+            self.current_playlist_tracks = local_tracks
+            self.display_tracks(local_tracks)
+            if not self.sp:
+                return  # Offline the local matches are the results
+        self.request_search_page(1)
+
+    def cancel_search(self):
+        """Drop pending results so a slow search cannot overwrite the view that replaced it."""
+        self.search_debounce.stop()
+        self.search_generation += 1
+        self.current_search_query = ""
+
+    def request_search_page(self, page):
+        """Fetch a page of the current search on a background thread unless it is cached or already on its way."""
+        if page in self.search_pages or page in self.search_pages_requested:
+            return
+        cached = SEARCH_CACHE.get(self.current_search_query, page)
+        if cached:
+            self.on_search_page_loaded(self.search_generation, page, cached[1], cached[0])
+            return
+        self.search_pages_requested.add(page)
+        thread = threading.Thread(target=self._perform_search, args=(self.search_generation, self.current_search_query, page))
+        thread.daemon = True
+        thread.start()
+
+    def _perform_search(self, generation, query, page):
+        if generation != self.search_generation:
+            return  # Superseded before the request was sent
         if self.sp:
             try:
-                limit = 50
-                total_fetched = 0
-                all_tracks = []
-                max_results = self.max_pages * limit
-
-                while total_fetched < max_results:
-                    results = self.sp.search(q=query, type="track", limit=limit, offset=offset)
-                    tracks = results["tracks"]["items"]
-                    all_tracks.extend(tracks)
-                    total_fetched += len(tracks)
-                    offset += limit
-                    if len(tracks) < limit:
-                        break
-
-                self.all_search_results = all_tracks[:max_results]
-                if not self.all_search_results:
-                    QMetaObject.invokeMethod(
-                        self,
-                        "show_search_message",
-                        Qt.ConnectionType.QueuedConnection,
-                        Q_ARG(str, "No tracks found for your query.")
-                    )
-                    return
-                self.search_complete.emit(self.all_search_results, total_fetched)
-                QMetaObject.invokeMethod(
-                    self,
-                    "show_page_buttons",
-                    Qt.ConnectionType.QueuedConnection
+                results = call_spotify(
+                    self.sp.search, q=query, type="track", limit=SEARCH_PAGE_SIZE,
+                    offset=(page - 1) * SEARCH_PAGE_SIZE, market=SPOTIFY_MARKET,
+                    is_cancelled=lambda: generation != self.search_generation
                 )
+                tracks = records_from_spotify(results["tracks"]["items"])
+                if page == 1 and not tracks:
+                    self.search_failed.emit(generation, page, "No tracks found for your query.")
+                    return
+                SEARCH_CACHE.put(query, page, results["tracks"]["total"], tracks)
+                self.search_page_loaded.emit(generation, page, tracks, results["tracks"]["total"])
             except Exception as e:
                 print(f"Error searching Spotify: {str(e)}")
-                QMetaObject.invokeMethod(
-                    self,
-                    "show_search_message",
-                    Qt.ConnectionType.QueuedConnection,
-                    Q_ARG(str, f"Error searching: {str(e)}")
-                )
-        else:
+                self.search_failed.emit(generation, page, f"Error searching: {str(e)}")
+        elif page == 1:
             track_info = {"title": query, "artist": "Unknown", "image_url": ""}
             QMetaObject.invokeMethod(
                 self,
@@ -1540,24 +3541,41 @@ class SpotifyMusicPlayer(QMainWindow):
     def show_search_message(self, message):
         QMessageBox.information(self, "Search Results", message)
 
-    @pyqtSlot(list, int)
-    def on_search_complete(self, tracks, total_fetched):
-        self.current_playlist_tracks = []
-        self.current_page = 1
-        for i, button in enumerate(self.page_buttons, 1):
-            button.setChecked(i == self.current_page)
-        self.display_current_page()
+    @pyqtSlot(int, int, str)
+    def on_search_failed(self, generation, page, message):
+        if generation != self.search_generation:
+            return
+        self.search_pages_requested.discard(page)  # Let change_page ask again
+        if page == 1 and not self.search_quiet and not self.search_showing_local:
+            self.show_search_message(message)
+
+    @pyqtSlot(int, int, list, int)
+    def on_search_page_loaded(self, generation, page, tracks, total):
+        if generation != self.search_generation:
+            return  # Results of a superseded search
+        self.search_pages[page] = tracks
+        self.search_pages_requested.discard(page)
+        self.search_total = total
+        self.show_page_buttons()
+        if page == self.current_page:
+            self.display_current_page()
 
     @pyqtSlot()
     def show_page_buttons(self):
+        available = self.available_search_pages()
+        for i, button in enumerate(self.page_buttons, 1):
+            button.setVisible(i <= available)
         self.page_widget.setVisible(True)
 
+    def available_search_pages(self):
+        return min(self.max_pages, -(-self.search_total // SEARCH_PAGE_SIZE))
+
     def display_current_page(self):
-        start_idx = (self.current_page - 1) * 50
-        end_idx = min(start_idx + 50, len(self.all_search_results))
-        page_tracks = self.all_search_results[start_idx:end_idx]
-        self.content_table.setRowCount(0)
-        self.display_tracks(page_tracks, self.content_table)
+        page_tracks = self.search_pages.get(self.current_page, [])
+        self.current_playlist_tracks = page_tracks
+        self.display_tracks(page_tracks)
+        if self.current_page in self.search_pages and self.current_page < self.available_search_pages():
+            self.request_search_page(self.current_page + 1)  # Prefetch the next page only
 
     def change_page(self, page):
         if 1 <= page <= self.max_pages and page != self.current_page:
@@ -1565,26 +3583,16 @@ class SpotifyMusicPlayer(QMainWindow):
             for i, button in enumerate(self.page_buttons, 1):
                 button.setChecked(i == page)
             self.display_current_page()
+            self.request_search_page(page)
 
     @pyqtSlot(dict)
     def play_track_from_search(self, track_info):
+        track_info = TrackRecord(track_info["title"], track_info["artist"], "N/A", image_url=track_info["image_url"])
         self.track_queue = [track_info]
         self.current_track = track_info
         self.current_track_index = 0
-        self.current_playlist_tracks = []
-        self.content_table.setRowCount(0)
-        self.content_table.insertRow(0)
-        self.content_table.setItem(0, 0, QTableWidgetItem(track_info["title"]))
-        self.content_table.setItem(0, 1, QTableWidgetItem(track_info["artist"]))
-        self.content_table.setItem(0, 2, QTableWidgetItem("N/A"))
-        self.content_table.setItem(0, 3, QTableWidgetItem("N/A"))
-        play_button = QPushButton("▶")
-        play_button.setStyleSheet("""
-            QPushButton { background-color: transparent; border: none; font-size: 14px; color: #1DB954; }
-            QPushButton:hover { background-color: #333; border-radius: 5px; }
-        """)
-        play_button.clicked.connect(lambda checked: self.play_from_button(0))
-        self.content_table.setCellWidget(0, 4, play_button)
+        self.current_playlist_tracks = [track_info]
+        self.display_tracks([track_info])
         self.load_track_async(track_info)
         self.update_queue_display()
 
@@ -1602,15 +3610,15 @@ class SpotifyMusicPlayer(QMainWindow):
 
         tracks_to_download = []
         for row in selected_rows:
-            title = self.content_table.item(row, 0).text()
-            artist = self.content_table.item(row, 1).text()
+            title = self.content_model.text(row, 0)
+            artist = self.content_model.text(row, 1)
             tracks_to_download.append((title, artist))
 
         self.start_download_worker(tracks_to_download)
 
     def delete_track(self, row):
-        title = self.content_table.item(row, 0).text()
-        artist = self.content_table.item(row, 1).text()
+        title = self.content_model.text(row, 0)
+        artist = self.content_model.text(row, 1)
         file_path = os.path.join(DOWNLOAD_FOLDER, f"{title} - {artist}.mp3")
         
         reply = QMessageBox.warning(
@@ -1625,19 +3633,20 @@ class SpotifyMusicPlayer(QMainWindow):
             try:
                 if os.path.exists(file_path):
                     os.remove(file_path)
-                    self.content_table.removeRow(row)
-                    if self.content_table.rowCount() == 0:
-                        self.content_table.insertRow(0)
-                        self.content_table.setItem(0, 0, QTableWidgetItem("No downloaded tracks found"))
-                        self.content_table.setItem(0, 1, QTableWidgetItem(""))
-                        self.content_table.setItem(0, 2, QTableWidgetItem(""))
-                        self.content_table.setItem(0, 3, QTableWidgetItem(""))
+                    LOCAL_INDEX.submit(index_downloaded_tracks)
+                    source_row = self.content_model.source_row(row)
+                    self.content_model.remove(row)
+                    if source_row < len(self.current_playlist_tracks):
+                        self.current_playlist_tracks.pop(source_row)
+                        self.downloaded_files.pop(source_row)
+                    if not self.content_model.rows:
+                        self.content_model.show_message("No downloaded tracks found")
                 else:
                     QMessageBox.warning(self, "Delete Error", "File not found on disk.")
                     self.load_downloaded_tracks()
             except Exception as e:
                 QMessageBox.critical(self, "Delete Error", f"Failed to delete file: {str(e)}")
-            if self.current_track and self.current_track["title"] == title and self.current_track["artist"] == artist:
+            if self.current_track and self.current_track.title == title and self.current_track.artist == artist:
                 self.reset_playback()
 
     def start_download_worker(self, tracks_to_download):
@@ -1686,6 +3695,8 @@ class SpotifyMusicPlayer(QMainWindow):
             print(f"Successfully downloaded {track_name}")
             if self.current_library_selection == "Downloaded":
                 self.load_downloaded_tracks()  # Refresh downloaded tracks view
+            else:
+                LOCAL_INDEX.submit(index_downloaded_tracks)
         else:
             print(f"Failed to download {track_name}")
             QMessageBox.warning(self, "Download Failed", f"Failed to download {track_name}")
@@ -1694,8 +3705,8 @@ class SpotifyMusicPlayer(QMainWindow):
         self.download_next()
 
     def show_context_menu(self, position):
-        indexes = self.content_table.selectedIndexes()
-        if not indexes:
+        indexes = self.content_table.selectionModel().selectedIndexes()
+        if not indexes or self.content_model.message is not None:
             return
         
         row = indexes[0].row()
@@ -1711,8 +3722,8 @@ class SpotifyMusicPlayer(QMainWindow):
         else:
             single_download_action = QAction("Download Track", self)
             single_download_action.triggered.connect(lambda: self.download_track(
-                self.content_table.item(row, 0).text(),
-                self.content_table.item(row, 1).text()
+                self.content_model.text(row, 0),
+                self.content_model.text(row, 1)
             ))
             menu.addAction(single_download_action)
 
@@ -1725,13 +3736,102 @@ class SpotifyMusicPlayer(QMainWindow):
 
         menu.exec(self.content_table.viewport().mapToGlobal(position))
 
+    def show_playlist_context_menu(self, position):
+        item = self.playlist_list.itemAt(position)
+        if not item or not item.data(Qt.ItemDataRole.UserRole) or not self.sp:
+            return
+        menu = QMenu(self)
+        warm_action = QAction("Prepare Playlist for Playback", self)
+        warm_action.triggered.connect(lambda: self.warm_playlist(item))
+        menu.addAction(warm_action)
+        menu.exec(self.playlist_list.viewport().mapToGlobal(position))
+
+    def warm_playlist(self, item):
+        """Open the playlist and resolve all of its tracks into the stream cache."""
+        playlist_id = item.data(Qt.ItemDataRole.UserRole)
+        if self.current_playlist_selection != playlist_id:
+            self.playlist_list.setCurrentItem(item)
+            self.on_playlist_item_clicked(item)
+        if "content" in self.library_loads:
+            self.pending_warm_playlist = playlist_id  # Warmed by on_playlist_tracks_shown once loaded
+            return
+        self.warm_current_tracks()
+
+    def warm_current_tracks(self):
+        tracks = [(track.title, track.artist) for track in self.current_playlist_tracks]
+        if tracks:
+            self.start_warm_worker(tracks)
+
+    def start_warm_worker(self, tracks):
+        if self.warm_worker and self.warm_worker.isRunning():
+            self.warm_worker.progress_updated.disconnect()
+            self.warm_worker.warm_finished.disconnect()
+            self.warm_worker.cancel()
+            self.warm_worker.wait()
+        if self.warm_progress_dialog:
+            self.warm_progress_dialog.close()
+
+        self.warm_progress_dialog = QProgressDialog("Preparing tracks for playback...", "Cancel", 0, len(tracks), self)
+        self.warm_progress_dialog.setWindowTitle("Preparing Playlist")
+        self.warm_progress_dialog.setMinimumDuration(0)
+        self.warm_progress_dialog.setValue(0)
+
+        self.warm_worker = PlaylistWarmWorker(tracks)
+        self.warm_worker.progress_updated.connect(self.update_warm_progress_slot)
+        self.warm_worker.warm_finished.connect(self.on_warm_finished)
+        self.warm_progress_dialog.canceled.connect(self.warm_worker.cancel)
+        self.warm_worker.start()
+
+    @pyqtSlot(int, int)
+    def update_warm_progress_slot(self, done, total):
+        if self.warm_progress_dialog:
+            self.warm_progress_dialog.setLabelText(f"Prepared {done} of {total} tracks")
+            self.warm_progress_dialog.setValue(done)
+
+    @pyqtSlot(int, int, bool)
+    def on_warm_finished(self, resolved, failed, cancelled):
+        if self.warm_progress_dialog:
+            self.warm_progress_dialog.close()
+            self.warm_progress_dialog = None
+        self.warm_worker = None
+        if cancelled:
+            print(f"Playlist warming cancelled after {resolved + failed} tracks")
+        else:
+            print(f"Playlist warming finished: {resolved} ready, {failed} not found")
+            if failed:
+                QMessageBox.information(self, "Playlist Prepared", f"{resolved} tracks are ready for playback, {failed} could not be found.")
+
     def closeEvent(self, event):
         if hasattr(self, 'current_download_worker') and self.current_download_worker and self.current_download_worker.isRunning():
             self.current_download_worker.cancel()
             self.current_download_worker.wait()
+        if self.warm_worker and self.warm_worker.isRunning():
+            self.warm_worker.cancel()
+            self.warm_worker.wait()
+        for loader in self.library_loaders:
+            loader.cancel()
+        # Cancelled loaders stop at their next page or retry; only an in-flight request can hold them up
+        deadline = time.monotonic() + LIBRARY_LOADER_EXIT_WAIT_MS / 1000
+        for loader in self.library_loaders:
+            remaining = max(0, int((deadline - time.monotonic()) * 1000))
+            if not loader.wait(remaining):
+                print("Library load still running at exit, not waiting for it")
         self.vlc_player.stop()
         self.vlc_player.release()
         self.vlc_instance.release()
+        print(f"Stream resolver stats: {RESOLVER.stats()}")
+        print(f"YoutubeDL pool stats: {YDL_POOL.stats()}")
+        print(f"HTTP stats: {HTTP.stats()}")
+        print(f"Search cache stats: {SEARCH_CACHE.stats()}")
+        print(f"Album art stats: {self.album_art_loader.stats()}")
+        self.album_art_loader.close()
+        LOCAL_INDEX.close()
+        YDL_POOL.close()
+        HTTP.close()
+        if STREAM_CACHE:
+            STREAM_CACHE.close()
+        SPOTIFY_CACHE.close()
+        SEARCH_CACHE.close()
         super().closeEvent(event)
 
 if __name__ == "__main__":
@@ -1750,8 +3850,8 @@ if __name__ == "__main__":
         QPushButton { background-color: transparent; border: none; border-radius: 15px; padding: 5px; font-size: 16px; color: #ffffff; }
         QPushButton:hover { background-color: #333; }
         QLineEdit { border: 1px solid #333; border-radius: 15px; padding: 5px 10px; color: #ffffff; background-color: #2a2a2a; }
-        QTableWidget { border: none; gridline-color: #333; color: #ffffff; background-color: #1a1a1a; }
-        QTableWidget::item { padding: 5px; color: #ffffff; }
+        QTableView { border: none; gridline-color: #333; color: #ffffff; background-color: #1a1a1a; }
+        QTableView::item { padding: 5px; color: #ffffff; }
         QHeaderView::section { background-color: #2a2a2a; border: none; padding: 5px; font-weight: bold; color: #ffffff; }
         QSlider { background-color: transparent; }
         QSlider::handle { background-color: #1DB954; border-radius: 7px; width: 14px; height: 14px; }
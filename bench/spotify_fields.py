@@ -0,0 +1,257 @@
+# Benchmark the Spotify response trimming in app.py against a local stand-in of the API
+"""Compare the bytes and wall time of fetching a library with and without trimming.
+
+A stand-in of the two Spotify endpoints app.py pages through most is
+served from a local HTTP server. Its library is generated from a fixed
+seed, so every run serves the same recording:
+
+- /v1/playlists/<id>/tracks honours limit, offset, market and the fields
+  projection syntax.
+- /v1/me/tracks honours limit, offset and market. The real endpoint has no
+  fields parameter.
+
+As on Spotify, market=from_token drops the available_markets arrays and
+adds is_playable. Responses are recorded on a first untimed pass and
+replayed afterwards. Each scenario fetches every page through one
+keep-alive session and JSON-decodes it, like spotipy does for the app.
+The fields projection is read from app.py so the benchmark always uses
+the shipped value.
+
+Usage: python bench/spotify_fields.py [--tracks 5000] [--runs 5]
+Requires only the requests package.
+"""
+import argparse
+import ast
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "app.py")
+SEED = 20241016
+MARKETS = ["AD", "AE", "AG", "AL", "AM", "AO", "AR", "AT", "AU", "AZ", "BA", "BB", "BD", "BE", "BF", "BG",
+           "BH", "BI", "BJ", "BN", "BO", "BR", "BS", "BT", "BW", "BY", "BZ", "CA", "CD", "CG", "CH", "CI",
+           "CL", "CM", "CO", "CR", "CV", "CW", "CY", "CZ", "DE", "DJ", "DK", "DM", "DO", "DZ", "EC", "EE",
+           "EG", "ES", "ET", "FI", "FJ", "FM", "FR", "GA", "GB", "GD", "GE", "GH", "GM", "GN", "GQ", "GR",
+           "GT", "GW", "GY", "HK", "HN", "HR", "HT", "HU", "ID", "IE", "IL", "IN", "IQ", "IS", "IT", "JM",
+           "JO", "JP", "KE", "KG", "KH", "KI", "KM", "KN", "KR", "KW", "KZ", "LA", "LB", "LC", "LI", "LK",
+           "LR", "LS", "LT", "LU", "LV", "LY", "MA", "MC", "MD", "ME", "MG", "MH", "MK", "ML", "MN", "MO",
+           "MR", "MT", "MU", "MV", "MW", "MX", "MY", "MZ", "NA", "NE", "NG", "NI", "NL", "NO", "NP", "NR",
+           "NZ", "OM", "PA", "PE", "PG", "PH", "PK", "PL", "PS", "PT", "PW", "PY", "QA", "RO", "RS", "RW",
+           "SA", "SB", "SC", "SE", "SG", "SI", "SK", "SL", "SM", "SN", "SR", "ST", "SV", "SZ", "TD", "TG",
+           "TH", "TJ", "TL", "TN", "TO", "TR", "TT", "TV", "TW", "TZ", "UA", "UG", "US", "UY", "UZ", "VC",
+           "VE", "VN", "VU", "WS", "XK", "ZA", "ZM", "ZW"]
+
+# Read a string constant from app.py without importing it (app.py needs PyQt6, VLC and spotipy)
+def app_constant(name):
+    with open(APP_PATH, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == name for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise KeyError(name)
+
+# Build a random Spotify ID
+def spotify_id(rng):
+    return "".join(rng.choice("0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(22))
+
+# Build an artist object as Spotify embeds it in tracks and albums
+def simple_artist(rng):
+    artist_id = spotify_id(rng)
+    return {
+        "external_urls": {"spotify": f"https://open.spotify.com/artist/{artist_id}"},
+        "href": f"https://api.spotify.com/v1/artists/{artist_id}",
+        "id": artist_id,
+        "name": f"Artist {rng.randint(1, 2000)}",
+        "type": "artist",
+        "uri": f"spotify:artist:{artist_id}",
+    }
+
+# Build a playlist or saved-tracks item shaped like Spotify's full response
+def library_item(rng, index):
+    track_id, album_id = spotify_id(rng), spotify_id(rng)
+    artists = [simple_artist(rng) for _ in range(rng.choice([1, 1, 1, 2, 3]))]
+    markets = sorted(rng.sample(MARKETS, rng.randint(150, len(MARKETS))))
+    album = {
+        "album_type": "album",
+        "artists": artists[:1],
+        "available_markets": markets,
+        "external_urls": {"spotify": f"https://open.spotify.com/album/{album_id}"},
+        "href": f"https://api.spotify.com/v1/albums/{album_id}",
+        "id": album_id,
+        "images": [
+            {"height": size, "url": f"https://i.scdn.co/image/{spotify_id(rng)}", "width": size}
+            for size in (640, 300, 64)
+        ],
+        "name": f"Album {rng.randint(1, 5000)}",
+        "release_date": f"{rng.randint(1960, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "release_date_precision": "day",
+        "total_tracks": rng.randint(1, 20),
+        "type": "album",
+        "uri": f"spotify:album:{album_id}",
+    }
+    return {
+        "added_at": f"2024-01-01T00:00:{index % 60:02d}Z",
+        "added_by": {"id": "standin", "type": "user", "uri": "spotify:user:standin"},
+        "is_local": False,
+        "primary_color": None,
+        "track": {
+            "album": album,
+            "artists": artists,
+            "available_markets": markets,
+            "disc_number": 1,
+            "duration_ms": rng.randint(90000, 420000),
+            "explicit": rng.random() < 0.2,
+            "external_ids": {"isrc": f"USRC1{rng.randint(1000000, 9999999)}"},
+            "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+            "href": f"https://api.spotify.com/v1/tracks/{track_id}",
+            "id": track_id,
+            "is_local": False,
+            "name": f"Track {index} {rng.random():.6f}",
+            "popularity": rng.randint(0, 100),
+            "preview_url": f"https://p.scdn.co/mp3-preview/{spotify_id(rng)}",
+            "track_number": rng.randint(1, 20),
+            "type": "track",
+            "uri": f"spotify:track:{track_id}",
+        },
+        "video_thumbnail": {"url": None},
+    }
+
+# Parse Spotify's fields syntax, e.g. "items(added_at,track(name)),total", into nested dicts
+def parse_fields(fields):
+    tree, stack, name = {}, [], ""
+    node = tree
+    for token in re.findall(r"[^(),]+|[(),]", fields):
+        if token == "(":
+            node[name] = node = node.get(name) or {}
+            stack.append(name)
+        elif token == ")":
+            stack.pop()
+            node = tree
+            for key in stack:
+                node = node[key]
+        elif token != ",":
+            name = token.strip()
+            node[name] = None
+    return tree
+
+# Keep only the projected fields, applying the projection to every element of lists
+def project(value, tree):
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: value[key] if sub is None else project(value[key], sub)
+            for key, sub in tree.items() if key in value}
+
+# Drop available_markets and mark items playable, as market=from_token does
+def apply_market(value):
+    if isinstance(value, list):
+        return [apply_market(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    trimmed = {key: apply_market(item) for key, item in value.items() if key != "available_markets"}
+    if value.get("type") == "track":
+        trimmed["is_playable"] = True
+    return trimmed
+
+# Define the request handler of the stand-in API
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the pooled sessions in app.py
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes; don't stall small replies
+    items = []
+    recorded = {}  # Request path -> response body, so timed runs don't pay for building responses
+
+    def do_GET(self):
+        body = self.recorded.get(self.path)
+        if body is None:
+            body = self.build_response()
+            if body is None:
+                self.send_error(404)
+                return
+            self.recorded[self.path] = body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def build_response(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        limit, offset = int(params.get("limit", 20)), int(params.get("offset", 0))
+        if re.fullmatch(r"/v1/playlists/[^/]+/tracks", url.path):
+            page_items = self.items[offset:offset + limit]
+        elif url.path == "/v1/me/tracks":
+            page_items = [{"added_at": item["added_at"], "track": item["track"]}
+                          for item in self.items[offset:offset + limit]]
+        else:
+            return None
+        page = {
+            "href": f"http://{self.headers['Host']}{self.path}",
+            "items": page_items,
+            "limit": limit,
+            "next": None,
+            "offset": offset,
+            "previous": None,
+            "total": len(self.items),
+        }
+        if params.get("market") == "from_token":
+            page = apply_market(page)
+        if "fields" in params:
+            page = project(page, parse_fields(params["fields"]))
+        return json.dumps(page).encode("utf-8")
+
+    def log_message(self, format, *args):
+        pass
+
+# Fetch every page of path and return (bytes received, seconds)
+def fetch_all(session, base_url, path, limit, total, params):
+    received = 0
+    start = time.perf_counter()
+    for offset in range(0, total, limit):
+        response = session.get(f"{base_url}{path}", params=dict(params, limit=limit, offset=offset))
+        response.raise_for_status()
+        received += len(response.content)
+        response.json()
+    return received, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=5000, help="size of the stand-in library")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per scenario, the best is reported")
+    args = parser.parse_args()
+
+    rng = random.Random(SEED)
+    StandInHandler.items = [library_item(rng, i) for i in range(args.tracks)]
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    fields = app_constant("SPOTIFY_PLAYLIST_TRACK_FIELDS")
+    market = app_constant("SPOTIFY_MARKET")
+    scenarios = [
+        ("playlist_tracks", "/v1/playlists/standin/tracks", 100, {}),
+        ("playlist_tracks + fields", "/v1/playlists/standin/tracks", 100, {"fields": fields}),
+        ("saved tracks", "/v1/me/tracks", 50, {}),
+        ("saved tracks + market", "/v1/me/tracks", 50, {"market": market}),
+    ]
+    print(f"{args.tracks} tracks, best of {args.runs} runs")
+    with requests.Session() as session:
+        for name, path, limit, params in scenarios:
+            fetch_all(session, base_url, path, limit, args.tracks, params)  # Records the responses
+            runs = [fetch_all(session, base_url, path, limit, args.tracks, params) for _ in range(args.runs)]
+            received = runs[0][0]
+            best = min(seconds for _, seconds in runs)
+            pages = -(-args.tracks // limit)
+            print(f"{name:<26} {pages:>4} pages  {received / 1e6:8.2f} MB  {best * 1000:8.0f} ms")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
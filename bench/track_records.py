@@ -0,0 +1,73 @@
+# Benchmark the memory held by TrackRecord against the Spotify JSON it replaces
+"""Compare the memory of a library kept as parsed Spotify items and as track records.
+
+The library is the seeded stand-in of bench/spotify_fields.py: saved-track
+items with full album and artist objects and available_markets lists.
+It is serialized once and parsed back, so no strings are shared between
+items, as with real responses. tracemalloc then measures:
+
+- the parsed items, as the app held them before TrackRecord;
+- the records built from them by records_from_spotify, once the items
+  are freed;
+- the JSON written to the cache, for the raw items and for record rows.
+
+TrackRecord and its helpers are read from app.py, so the benchmark always
+measures the shipped class.
+
+Usage: python bench/track_records.py [--tracks 10000]
+Requires only the requests package, for bench/spotify_fields.py.
+"""
+import argparse
+import ast
+import gc
+import json
+import random
+import sys
+import tracemalloc
+
+from spotify_fields import APP_PATH, SEED, library_item
+
+# Load top-level definitions from app.py without importing it (app.py needs PyQt6, VLC and spotipy)
+def app_definitions(*names):
+    with open(APP_PATH, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    nodes = [node for node in tree.body
+             if getattr(node, "name", None) in names
+             or isinstance(node, ast.Assign) and any(getattr(t, "id", None) in names for t in node.targets)]
+    namespace = {"sys": sys}
+    exec(compile(ast.Module(body=nodes, type_ignores=[]), APP_PATH, "exec"), namespace)
+    return namespace
+
+# Return the bytes tracemalloc currently traces after a full collection
+def traced_bytes():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=10000, help="size of the stand-in library")
+    args = parser.parse_args()
+
+    app = app_definitions("ALBUM_ART_SIZE", "pick_image_url", "TrackRecord", "records_from_spotify")
+    rng = random.Random(SEED)
+    raw = json.dumps([{"added_at": item["added_at"], "track": item["track"]}
+                      for item in (library_item(rng, i) for i in range(args.tracks))])
+
+    tracemalloc.start()
+    baseline = traced_bytes()
+    items = json.loads(raw)
+    items_bytes = traced_bytes() - baseline
+    records = app["records_from_spotify"](items)
+    del items
+    records_bytes = traced_bytes() - baseline
+    tracemalloc.stop()
+
+    rows_json = json.dumps([record.to_row() for record in records])
+    print(f"{args.tracks} tracks")
+    print(f"{'parsed items':<16} {items_bytes / 1e6:8.1f} MB")
+    print(f"{'track records':<16} {records_bytes / 1e6:8.1f} MB  {items_bytes / records_bytes:5.1f}x smaller")
+    print(f"{'cached items':<16} {len(raw) / 1e6:8.1f} MB")
+    print(f"{'cached rows':<16} {len(rows_json) / 1e6:8.1f} MB  {len(raw) / len(rows_json):5.1f}x smaller")
+
+if __name__ == "__main__":
+    main()